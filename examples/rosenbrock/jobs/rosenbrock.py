@@ -27,6 +27,17 @@ def rosenbrock(variables: NDArray[np.float64], realization: int) -> float:
     return -objective
 
 
+def rosenbrock_batch(
+    variables: NDArray[np.float64], realizations: NDArray[np.intc]
+) -> NDArray[np.float64]:
+    """Evaluate the rosenbrock function for a batch of variables, in-process."""
+    rng = default_rng(seed=123)
+    a = rng.normal(loc=1.0, scale=0.01, size=NREAL)[realizations, np.newaxis]
+    b = rng.normal(loc=100.0, scale=1, size=NREAL)[realizations, np.newaxis]
+    x, y = variables[:, :-1], variables[:, 1:]
+    return -np.sum((a - x) ** 2 + b * (y - x * x) ** 2, axis=1)
+
+
 def _read_point(filename: Path) -> NDArray[np.float64]:
     with filename.open("r", encoding="utf-8") as f:
         variables = json.load(f)
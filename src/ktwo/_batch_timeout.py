@@ -0,0 +1,101 @@
+"""This module implements the k2 batch timeout step."""
+
+from __future__ import annotations
+
+import dataclasses
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Annotated
+
+from pydantic import BaseModel, ConfigDict, Field, PositiveInt
+from ropt.plugins.plan.base import PlanStep
+
+if TYPE_CHECKING:
+    from ert.config import QueueConfig
+    from ropt.config.plan import PlanStepConfig
+    from ropt.plan import Plan
+
+
+@dataclass(slots=True)
+class _BatchTimeout:
+    """The timeout settings applied to the batches that are evaluated.
+
+    Attributes:
+        max_runtime: Maximum run time of a realization, in seconds.
+        quantile:    Fraction of the realizations of a batch that must finish,
+                     before slow realizations are stopped.
+    """
+
+    max_runtime: int | None = None
+    quantile: float | None = None
+
+    def apply(self, queue_config: QueueConfig, size: int) -> tuple[QueueConfig, int]:
+        """Apply the settings to a queue configuration, for a batch of a given size.
+
+        Returns:
+            The modified queue configuration, and the minimum number of
+            realizations that must finish before slow realizations are stopped.
+        """
+        if self.max_runtime is None and self.quantile is None:
+            return queue_config, 0
+        min_realizations = (
+            0 if self.quantile is None else max(1, math.ceil(self.quantile * size))
+        )
+        return dataclasses.replace(
+            queue_config,
+            max_runtime=(
+                queue_config.max_runtime
+                if self.max_runtime is None
+                else self.max_runtime
+            ),
+            stop_long_running=self.quantile is not None,
+        ), min_realizations
+
+
+class K2BatchTimeoutStep(PlanStep):
+    """The k2 batch timeout step.
+
+    This step sets the timeouts of the realizations in the batches that are
+    evaluated after it has run. Realizations that time out, or that are
+    stopped, are treated as failed realizations by the optimizer.
+    """
+
+    class K2BatchTimeoutStepWith(BaseModel):
+        """Parameters used by the batch timeout step.
+
+        If no parameters are given, the timeouts are reset.
+
+        Attributes:
+            max_runtime: Maximum run time of a realization, in seconds.
+            quantile:    Stop realizations that run much longer than the average
+                         run time, after this fraction of the batch has finished.
+        """
+
+        max_runtime: PositiveInt | None = None
+        quantile: Annotated[float, Field(gt=0.0, le=1.0)] | None = None
+
+        model_config = ConfigDict(
+            extra="forbid",
+            validate_default=True,
+            arbitrary_types_allowed=True,
+            frozen=True,
+        )
+
+    def __init__(
+        self, config: PlanStepConfig, plan: Plan, batch_timeout: _BatchTimeout
+    ) -> None:
+        """Initialize a batch timeout step.
+
+        Args:
+            config:        The configuration of the step.
+            plan:          The plan that runs this step.
+            batch_timeout: The timeout settings to modify.
+        """
+        super().__init__(config, plan)
+        self._with = self.K2BatchTimeoutStepWith.model_validate(config.with_ or {})
+        self._batch_timeout = batch_timeout
+
+    def run(self) -> None:
+        """Run the batch timeout step."""
+        self._batch_timeout.max_runtime = self._with.max_runtime
+        self._batch_timeout.quantile = self._with.quantile
@@ -0,0 +1,310 @@
+"""This module implements the persistent evaluation cache of k2."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, Iterable
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, PositiveFloat, PositiveInt
+
+if TYPE_CHECKING:
+    from everest.config import EverestConfig
+    from numpy.typing import NDArray
+
+# The sections of the Everest configuration that determine the outcome of a
+# forward model run, for a given set of control values and realization:
+_FINGERPRINT_FIELDS = {
+    "controls",
+    "objective_functions",
+    "output_constraints",
+    "model",
+    "wells",
+    "definitions",
+    "install_jobs",
+    "install_data",
+    "install_templates",
+    "forward_model",
+}
+
+# Quantized values must be smaller than this to be converted to 64-bit integers:
+_MAX_QUANTIZED: Final = 2.0**63
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    realization INTEGER NOT NULL,
+    controls BLOB NOT NULL,
+    objectives BLOB NOT NULL,
+    constraints BLOB,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS claims (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    host TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+
+class K2CacheConfig(BaseModel):
+    """Configuration of the persistent evaluation cache.
+
+    Attributes:
+        path:        Path of the cache database, relative to the Everest config,
+                     by default stored in the Everest output directory.
+        resolution:  Resolution used to quantize control values.
+        max_entries: Maximum number of entries, least recently used are evicted.
+        max_age:     Maximum age of entries in seconds.
+        shared:      Share the cache between concurrently running processes.
+        claim_timeout: Time in seconds after which a claim is considered stale.
+        poll_interval: Time in seconds between checks for claimed entries.
+    """
+
+    path: str | None = None
+    resolution: PositiveFloat = float(np.finfo(np.float32).eps)
+    max_entries: PositiveInt | None = None
+    max_age: PositiveFloat | None = None
+    shared: bool = False
+    claim_timeout: PositiveFloat = 86400.0
+    poll_interval: PositiveFloat = 5.0
+
+    model_config = ConfigDict(
+        extra="forbid",
+        validate_default=True,
+        frozen=True,
+    )
+
+
+class _EvaluationCache:
+    """A persistent cache of forward model results.
+
+    Results are stored in a SQLite database, keyed by a hash of the quantized
+    control values, the realization, and a fingerprint of the parts of the
+    Everest configuration that define the forward model. Entries are therefore
+    found regardless of the batch they were evaluated in, and are shared
+    between the steps of a plan, and between runs using the same database.
+
+    This class implements the same interface as the in-memory simulator cache
+    of the Everest run model, and can be used in its place.
+
+    In shared mode, entries that are about to be evaluated can be claimed, to
+    signal to other processes that they will become available, and should not
+    be evaluated again. Claims of processes that have stopped on the same host,
+    or that are older than a timeout, are considered stale and are ignored.
+    """
+
+    def __init__(self, config: K2CacheConfig, everest_config: EverestConfig) -> None:
+        path = (
+            Path(everest_config.output_dir) / "cache.sqlite"
+            if config.path is None
+            else Path(everest_config.config_directory) / config.path
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            path, timeout=60.0, isolation_level="DEFERRED", check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._fingerprint = _get_fingerprint(everest_config)
+        self._config = config
+        self._accessed: dict[str, float] = {}
+        self._host = socket.gethostname()
+        self._owner = f"{self._host}:{os.getpid()}:{uuid.uuid4().hex}"
+        self.flush()
+
+    @property
+    def shared(self) -> bool:
+        """Return `True` if the cache is shared between processes."""
+        return self._config.shared
+
+    @property
+    def poll_interval(self) -> float:
+        """Return the interval for polling claimed entries."""
+        return self._config.poll_interval
+
+    def add(
+        self,
+        realization: int,
+        control_values: NDArray[np.float64],
+        objectives: NDArray[np.float64],
+        constraints: NDArray[np.float64] | None,
+    ) -> None:
+        """Add the results of a forward model run.
+
+        Results of failed runs, containing NaN values, are not stored.
+        """
+        if np.any(np.isnan(objectives)) or (
+            constraints is not None and np.any(np.isnan(constraints))
+        ):
+            return
+        now = time.time()
+        self._connection.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                self._get_key(realization, control_values),
+                realization,
+                _to_blob(control_values),
+                _to_blob(objectives),
+                None if constraints is None else _to_blob(constraints),
+                now,
+                now,
+            ),
+        )
+
+    def get(
+        self, realization: int, controls: NDArray[np.float64]
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64] | None] | None:
+        """Get the stored results for a realization and control values."""
+        key = self._get_key(realization, controls)
+        row = self._connection.execute(
+            "SELECT objectives, constraints, created FROM entries WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        objectives, constraints, created = row
+        now = time.time()
+        if self._config.max_age is not None and now - created > self._config.max_age:
+            return None
+        # Access times are written on flush, to avoid holding a write lock:
+        self._accessed[key] = now
+        return (
+            np.frombuffer(objectives, dtype=np.float64).copy(),
+            None
+            if constraints is None
+            else np.frombuffer(constraints, dtype=np.float64).copy(),
+        )
+
+    def claim(self, items: Iterable[tuple[int, NDArray[np.float64]]]) -> bool:
+        """Claim entries for a set of realizations and control values.
+
+        If any of the entries is already stored, or claimed by another process,
+        nothing is claimed and `False` is returned. Expired entries are not
+        considered to be stored, as in `get`.
+        """
+        keys = [self._get_key(realization, controls) for realization, controls in items]
+        now = time.time()
+        min_created = (
+            -math.inf if self._config.max_age is None else now - self._config.max_age
+        )
+        self._connection.commit()
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            for key in keys:
+                if self._connection.execute(
+                    "SELECT 1 FROM entries WHERE key = ? AND created >= ?",
+                    (key, min_created),
+                ).fetchone() is not None or not self._check_claim(key, now):
+                    return False
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO claims VALUES (?, ?, ?, ?, ?)",
+                [(key, self._owner, self._host, os.getpid(), now) for key in keys],
+            )
+        finally:
+            self._connection.commit()
+        return True
+
+    def release(self) -> None:
+        """Release all claims held by this process."""
+        self._connection.execute("DELETE FROM claims WHERE owner = ?", (self._owner,))
+        self._connection.commit()
+
+    def flush(self) -> None:
+        """Evict expired and excess entries, and commit pending changes."""
+        self._connection.executemany(
+            "UPDATE entries SET accessed = ? WHERE key = ?",
+            [(accessed, key) for key, accessed in self._accessed.items()],
+        )
+        self._accessed = {}
+        if self._config.max_age is not None:
+            self._connection.execute(
+                "DELETE FROM entries WHERE created < ?",
+                (time.time() - self._config.max_age,),
+            )
+        if self._config.max_entries is not None:
+            self._connection.execute(
+                "DELETE FROM entries WHERE key IN ("
+                "SELECT key FROM entries ORDER BY accessed DESC LIMIT -1 OFFSET ?"
+                ")",
+                (self._config.max_entries,),
+            )
+        self._connection.commit()
+
+    def close(self) -> None:
+        """Commit pending changes, release claims, and close the database."""
+        self.flush()
+        self.release()
+        self._connection.close()
+
+    def _check_claim(self, key: str, now: float) -> bool:
+        # Return `False` if the key is claimed by another process, removing
+        # the claim if it is stale:
+        row = self._connection.execute(
+            "SELECT owner, host, pid, created FROM claims WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return True
+        owner, host, pid, created = row
+        if owner == self._owner:
+            return True
+        if now - created > self._config.claim_timeout or (
+            host == self._host and not _is_running(pid)
+        ):
+            self._connection.execute("DELETE FROM claims WHERE key = ?", (key,))
+            return True
+        return False
+
+    def _get_key(self, realization: int, control_values: NDArray[np.float64]) -> str:
+        # Quantize the control values, mapping -0.0 and 0.0 to the same value:
+        quantized = (
+            np.round(
+                np.asarray(control_values, dtype=np.float64) / self._config.resolution
+            )
+            + 0.0
+        )
+        digest = hashlib.sha256(self._fingerprint)
+        digest.update(str(realization).encode())
+        if np.all(np.abs(quantized) < _MAX_QUANTIZED):
+            digest.update(quantized.astype(np.int64).tobytes())
+        else:
+            # Conversion to integers would overflow, use the float values, with
+            # a marker to distinguish them from integer keys:
+            digest.update(b"f")
+            digest.update(quantized.tobytes())
+        return digest.hexdigest()
+
+
+def _get_fingerprint(everest_config: EverestConfig) -> bytes:
+    config: dict[str, Any] = everest_config.model_dump(
+        mode="json", include=_FINGERPRINT_FIELDS, exclude_none=True
+    )
+    return hashlib.sha256(
+        json.dumps(config, sort_keys=True, separators=(",", ":")).encode()
+    ).digest()
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _to_blob(values: NDArray[np.float64]) -> bytes:
+    return np.ascontiguousarray(values, dtype=np.float64).tobytes()
@@ -0,0 +1,94 @@
+"""This module implements the validation of k2 plans, without running them."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Final
+
+from ropt.config.plan import PlanStepConfig, ResultHandlerConfig
+from ropt.plan import OptimizerContext, Plan
+from ropt.plugins import PluginManager
+from ropt.plugins.plan.base import PlanPlugin, PlanStep, ResultHandler
+
+from ._batch_timeout import K2BatchTimeoutStep
+from ._functions import _results2arrays, _results2dict
+from ._optimizer import K2OptimizerStep
+from ._results_arrow import K2ResultsArrowHandler
+from ._results_table import K2ResultsTableHandler
+from ._save_arrays import K2SaveArraysStep
+from ._surrogate import K2SurrogateStep
+from ._workflow_job import K2WorkflowJobStep
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+    from ropt.config.plan import PlanConfig
+    from ropt.plan import Event
+
+_WITH_MODELS: Final[dict[str, type[BaseModel]]] = {
+    "optimizer": K2OptimizerStep.DefaultOptimizerStepWith,
+    "workflow_job": K2WorkflowJobStep.K2WorkflowJobStepWith,
+    "batch_timeout": K2BatchTimeoutStep.K2BatchTimeoutStepWith,
+    "surrogate": K2SurrogateStep.K2SurrogateStepWith,
+    "save_arrays": K2SaveArraysStep.K2SaveArraysStepWith,
+    "results_table": K2ResultsTableHandler.K2ResultsTableHandlerWith,
+    "results_arrow": K2ResultsArrowHandler.K2ResultsArrowHandlerWith,
+}
+
+
+def _check_plan(config: PlanConfig, variables: dict[str, Any]) -> None:
+    """Validate a plan, including the configuration of its steps and handlers.
+
+    The plan is created, but not run. Steps and handlers provided by ropt are
+    created as usual, the `with` fields of the k2 steps and handlers are only
+    validated. Nested plans are validated recursively.
+
+    Args:
+        config:    The plan configuration.
+        variables: The variables that are available to the plan.
+    """
+    plugin_manager = PluginManager()
+    plugin_manager.add_plugin("plan", "k2", _CheckPlanPlugin(), prioritize=True)
+    Plan(
+        config,
+        OptimizerContext(
+            evaluator=_no_evaluator,
+            plugin_manager=plugin_manager,
+            variables=variables,
+        ),
+    )
+
+
+def _no_evaluator(*_: Any) -> Any:  # noqa: ANN401
+    msg = "Plans are not evaluated when checking"
+    raise NotImplementedError(msg)
+
+
+class _CheckPlanPlugin(PlanPlugin):
+    def create(  # type: ignore[override]
+        self, config: PlanStepConfig | ResultHandlerConfig, plan: Plan
+    ) -> PlanStep | ResultHandler:
+        _, _, name = config.run.lower().rpartition("/")
+        with_ = _WITH_MODELS[name].model_validate(config.with_)
+        if isinstance(with_, K2OptimizerStep.DefaultOptimizerStepWith) and (
+            with_.nested_optimization is not None
+        ):
+            plan.spawn(with_.nested_optimization.plan)
+        if isinstance(config, ResultHandlerConfig):
+            return _CheckedResultHandler(config, plan)
+        return _CheckedStep(config, plan)
+
+    def is_supported(self, method: str) -> bool:
+        return method.lower() in _WITH_MODELS
+
+    @property
+    def functions(self) -> dict[str, Any]:
+        return {"results2dict": _results2dict, "results2arrays": _results2arrays}
+
+
+class _CheckedStep(PlanStep):
+    def run(self) -> None:
+        pass
+
+
+class _CheckedResultHandler(ResultHandler):
+    def handle_event(self, event: Event) -> Event:
+        return event
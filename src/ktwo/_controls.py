@@ -0,0 +1,230 @@
+"""This module implements bulk storage and export of control values."""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Sequence
+
+import numpy as np
+import xarray as xr
+from ert.config import ExtParamConfig
+from ert.substitutions import substitute_runpath_name
+
+if TYPE_CHECKING:
+    from ert.config import ParameterConfig
+    from ert.run_arg import RunArg
+    from ert.storage import Ensemble, Experiment
+    from numpy.typing import NDArray
+
+
+@dataclass(frozen=True, slots=True)
+class _ControlGroup:
+    """The layout of a control group in the control vector.
+
+    Attributes:
+        name:        The name of the group.
+        indices:     The indices of the group variables in the control vector.
+        names:       The names of the variables, as stored by ERT.
+        output_file: The file to export the values to.
+    """
+
+    name: str
+    indices: NDArray[np.intp]
+    names: tuple[str, ...]
+    output_file: str
+
+
+def _get_control_groups(
+    control_names: Sequence[tuple[Any, ...]],
+    parameter_configs: dict[str, ParameterConfig],
+) -> list[_ControlGroup]:
+    """Find the layout of the control groups, and validate it.
+
+    The variables of a group are ordered as `ExtParamConfig.to_dataset` orders
+    them, so that the stored and exported values are identical to those stored
+    by ERT. Only groups that ERT stores as external parameters are returned.
+
+    Args:
+        control_names:     The names of the controls, as tuples.
+        parameter_configs: The ERT parameter configurations.
+
+    Returns:
+        The control groups.
+    """
+    grouped: dict[str, dict[str, dict[str, int] | int]] = {}
+    for idx, control_name in enumerate(control_names):
+        group = grouped.setdefault(control_name[0], {})
+        variable_name = control_name[1]
+        if len(control_name) > 2:  # noqa: PLR2004
+            suffixes = group.setdefault(variable_name, {})
+            assert isinstance(suffixes, dict)
+            suffixes[str(control_name[2])] = idx
+        else:
+            group[variable_name] = idx
+
+    groups = []
+    for group_name, variables in grouped.items():
+        ext_config = parameter_configs.get(group_name)
+        if ext_config is None:
+            msg = f"Unknown control group: {group_name}"
+            raise KeyError(msg)
+        if not isinstance(ext_config, ExtParamConfig):
+            continue
+        _check_variables(ext_config, variables)
+        indices: list[int] = []
+        names: list[str] = []
+        for variable_name, value in variables.items():
+            if isinstance(value, dict):
+                indices.extend(value.values())
+                names.extend(f"{variable_name}\0{suffix}" for suffix in value)
+            else:
+                indices.append(value)
+                names.append(variable_name)
+        groups.append(
+            _ControlGroup(
+                name=group_name,
+                indices=np.array(indices, dtype=np.intp),
+                names=tuple(names),
+                output_file=ext_config.output_file,
+            )
+        )
+    return groups
+
+
+def _check_variables(
+    ext_config: ExtParamConfig, variables: dict[str, dict[str, int] | int]
+) -> None:
+    if len(ext_config) != len(variables):
+        msg = (
+            f"Expected {len(ext_config)} variables for control {ext_config.name}, "
+            f"received {len(variables)}."
+        )
+        raise KeyError(msg)
+    for variable_name, value in variables.items():
+        if variable_name not in ext_config:
+            msg = f"No such key: {variable_name}"
+            raise KeyError(msg)
+        suffixes = set(ext_config[variable_name])
+        if isinstance(value, dict):
+            if suffixes != value.keys():
+                msg = (
+                    f"Key {variable_name} has suffixes {sorted(suffixes)}, "
+                    f"received {list(value)}"
+                )
+                raise KeyError(msg)
+        elif suffixes:
+            msg = f"Key {variable_name} has suffixes, a suffix must be specified"
+            raise KeyError(msg)
+
+
+def _save_controls(
+    groups: list[_ControlGroup], controls: NDArray[np.float64], ensemble: Ensemble
+) -> None:
+    """Store the controls of all simulations of an ensemble.
+
+    Args:
+        groups:   The control groups.
+        controls: The control values, one row per simulation.
+        ensemble: The ensemble to store the values in.
+    """
+    realizations = np.arange(controls.shape[0])
+    datasets = [
+        (
+            group.name,
+            xr.Dataset(
+                {"values": (("realizations", "names"), controls[:, group.indices])},
+                coords={"realizations": realizations, "names": list(group.names)},
+            ),
+        )
+        for group in groups
+    ]
+    with ThreadPoolExecutor() as executor:
+        list(
+            executor.map(
+                lambda args: ensemble.save_parameters(*args),
+                (
+                    (name, int(sim_id), dataset)
+                    for sim_id in realizations
+                    for name, dataset in datasets
+                ),
+            )
+        )
+
+
+def _export_controls(
+    groups: list[_ControlGroup],
+    controls: NDArray[np.float64],
+    run_args: list[RunArg],
+    iteration: int,
+) -> None:
+    """Write the control files of a set of simulations.
+
+    This writes the same files as ERT does, from the values in memory, instead
+    of reading them back from storage.
+
+    Args:
+        groups:    The control groups.
+        controls:  The control values, one row per simulation.
+        run_args:  The run arguments of the simulations.
+        iteration: The iteration of the ensemble.
+    """
+
+    def _export(run_arg: RunArg) -> None:
+        for group in groups:
+            data: dict[str, Any] = {}
+            for name, value in zip(
+                group.names, controls[run_arg.iens, group.indices].tolist(), strict=True
+            ):
+                outer, sep, inner = name.partition("\0")
+                if sep:
+                    data.setdefault(outer, {})[inner] = value
+                else:
+                    data[name] = value
+            path = Path(run_arg.runpath) / substitute_runpath_name(
+                group.output_file, run_arg.iens, iteration
+            )
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("w", encoding="utf-8") as file_obj:
+                json.dump(data, file_obj)
+
+    with ThreadPoolExecutor() as executor:
+        list(executor.map(_export, (item for item in run_args if item.active)))
+
+
+class _EnsembleView:
+    """A view of an ensemble, that hides a set of parameter groups.
+
+    This is passed to the run path creation of ERT, to prevent it from
+    exporting control groups that were already exported.
+    """
+
+    def __init__(self, ensemble: Ensemble, hidden: set[str]) -> None:
+        self._ensemble = ensemble
+        self._hidden = hidden
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        return getattr(self._ensemble, name)
+
+    @property
+    def experiment(self) -> _ExperimentView:
+        return _ExperimentView(self._ensemble.experiment, self._hidden)
+
+
+class _ExperimentView:
+    def __init__(self, experiment: Experiment, hidden: set[str]) -> None:
+        self._experiment = experiment
+        self._hidden = hidden
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        return getattr(self._experiment, name)
+
+    @property
+    def parameter_configuration(self) -> dict[str, ParameterConfig]:
+        return {
+            name: config
+            for name, config in self._experiment.parameter_configuration.items()
+            if name not in self._hidden
+        }
@@ -0,0 +1,49 @@
+"""This module implements support for in-process Python evaluators."""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+from typing import TYPE_CHECKING, Callable, Union
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import numpy as np
+    from numpy.typing import NDArray
+
+_PythonEvaluator = Callable[
+    ["NDArray[np.float64]", "NDArray[np.intc]"],
+    Union[
+        "NDArray[np.float64]",
+        "tuple[NDArray[np.float64], NDArray[np.float64] | None]",
+    ],
+]
+
+
+def _load_evaluator(spec: str, base_dir: Path) -> _PythonEvaluator:
+    """Load a Python evaluator function.
+
+    The function is specified as `module:function`, or `path/to/file.py:function`
+    where relative paths are interpreted relative to `base_dir`.
+    """
+    module_name, sep, function_name = spec.rpartition(":")
+    if sep != ":" or not module_name or not function_name:
+        msg = f"Invalid evaluator specification: {spec}"
+        raise ValueError(msg)
+    if module_name.endswith(".py"):
+        path = base_dir / module_name
+        module_spec = importlib.util.spec_from_file_location(path.stem, path)
+        if module_spec is None or module_spec.loader is None:
+            msg = f"Cannot load evaluator module: {path}"
+            raise ImportError(msg)
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(module_name)
+    function = getattr(module, function_name, None)
+    if not callable(function):
+        msg = f"Evaluator function not found: {spec}"
+        raise TypeError(msg)
+    evaluator: _PythonEvaluator = function
+    return evaluator
@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from everest.config import EverestConfig
+import numpy as np
 from ropt.results import Results
 
-from ._utils import _get_names
+from ._utils import _get_everest_config, _get_names
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
 
 
 def _results2dict(
@@ -16,10 +19,52 @@ def _results2dict(
     if not isinstance(results, Results):
         msg = "Cannot retrieve dict from results"
         raise TypeError(msg)
-    names = _get_names(EverestConfig.model_validate(everest_config))
+    names = _get_names(_get_everest_config(everest_config))
     field_name, sep, sub_field_name = name.partition(".")
     if sep != ".":
         msg = "Invalid field specification"
         raise RuntimeError(msg)
     field = getattr(results, field_name)
     return field.to_dict(sub_field_name, names=names)
+
+
+def _results2arrays(
+    everest_config: dict[str, Any], results: Results, *fields: str
+) -> dict[str, NDArray[Any]]:
+    """Retrieve multiple fields of a results object as labelled arrays.
+
+    For each field, given as `field.sub_field`, the output contains the array
+    under that name, and the names of its axes under `field.sub_field.axes`.
+    The names of the items along each axis, if known, are stored under
+    `names.axis`.
+
+    Args:
+        everest_config: The Everest configuration.
+        results:        The results object.
+        fields:         The fields to retrieve.
+
+    Returns:
+        The arrays, by name.
+    """
+    if not isinstance(results, Results):
+        msg = "Cannot retrieve arrays from results"
+        raise TypeError(msg)
+    names = _get_names(_get_everest_config(everest_config)) or {}
+    arrays: dict[str, NDArray[Any]] = {}
+    for name in fields:
+        field_name, sep, sub_field_name = name.partition(".")
+        if sep != ".":
+            msg = "Invalid field specification"
+            raise RuntimeError(msg)
+        field = getattr(results, field_name, None)
+        value = None if field is None else getattr(field, sub_field_name, None)
+        if value is None:
+            msg = f"Field not available in results: {name}"
+            raise ValueError(msg)
+        axes = field.get_axes(sub_field_name)
+        arrays[name] = value
+        arrays[f"{name}.axes"] = np.array([str(axis) for axis in axes], dtype=np.str_)
+        for axis in axes:
+            if names.get(axis) is not None:
+                arrays[f"names.{axis}"] = np.asarray(names[axis])
+    return arrays
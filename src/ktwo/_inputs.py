@@ -0,0 +1,203 @@
+"""This module implements the installation of static input data in run paths."""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import os
+import shutil
+import stat
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Final, Iterable, Literal
+
+from pydantic import BaseModel, ConfigDict
+
+if TYPE_CHECKING:
+    from everest.config import EverestConfig
+
+# The Linux ioctl request that clones a file (copy-on-write):
+_FICLONE: Final = 0x40049409
+
+_BLOCK_SIZE: Final = 1 << 20
+
+_Mode = Literal["hardlink", "symlink", "reflink", "copy"]
+
+
+class K2InputsConfig(BaseModel):
+    """Configuration of the installation of static input data.
+
+    Input data that is installed by copying (`link: false`) is stored once per
+    run in a content-addressed store in the Everest output directory, and
+    installed from there in each run path, instead of being copied by the
+    forward model.
+
+    By default, the inputs are installed as reflinks, which share the data
+    until it is modified, if supported by the file system, and fall back to
+    copies otherwise. The installed files therefore behave as copies.
+
+    Hard links and symbolic links share the stored data between the run paths,
+    hence the stored files are made read-only. They are faster on file systems
+    without reflink support, but forward models cannot modify these inputs in
+    place. Hard links fall back to copies between file systems.
+
+    Attributes:
+        mode: How the inputs are installed in the run paths.
+    """
+
+    mode: _Mode = "reflink"
+
+    model_config = ConfigDict(
+        extra="forbid",
+        validate_default=True,
+        frozen=True,
+    )
+
+
+class _InputStore:
+    """Install input data in run paths from a content-addressed store."""
+
+    def __init__(self, config: K2InputsConfig, path: Path) -> None:
+        self._mode = config.mode
+        self._path = path.absolute()
+        self._inputs: list[tuple[str, dict[int, Path]]] = []
+        self._stored: dict[Path, Path] = {}
+
+    def add_install_data(self, everest_config: EverestConfig) -> EverestConfig:
+        """Store the input data installed by copying.
+
+        Returns:
+            A copy of the configuration, without the stored input data.
+        """
+        from everest.simulator.everest_to_ert import (  # noqa: PLC0415
+            _expand_source_path,
+        )
+
+        install_data = []
+        for item in everest_config.install_data or []:
+            if item.link:
+                install_data.append(item)
+                continue
+            source = _expand_source_path(item.source, everest_config)
+            self._inputs.append(
+                (
+                    item.target,
+                    {
+                        geo_id: self._store(
+                            Path(source.replace("<GEO_ID>", str(geo_id)))
+                        )
+                        for geo_id in everest_config.model.realizations
+                    },
+                )
+            )
+        return everest_config.model_copy(update={"install_data": install_data})
+
+    def install(self, runpaths: Iterable[tuple[str, int]]) -> None:
+        """Install the stored input data in a set of run paths.
+
+        Args:
+            runpaths: Tuples of run paths and their realization (geo) IDs.
+        """
+
+        def _install_all(runpath: str, geo_id: int) -> None:
+            for target, objects in self._inputs:
+                _install(
+                    objects[geo_id],
+                    Path(runpath) / target.replace("<GEO_ID>", str(geo_id)),
+                    self._mode,
+                )
+
+        if self._inputs:
+            with ThreadPoolExecutor() as executor:
+                list(executor.map(lambda args: _install_all(*args), runpaths))
+
+    def _store(self, source: Path) -> Path:
+        if not source.exists():
+            msg = f"Expected source to exist for data installation: {source}"
+            raise ValueError(msg)
+        # Sources without a realization placeholder are shared by realizations:
+        source = source.resolve()
+        if source in self._stored:
+            return self._stored[source]
+        path = self._path / _digest(source)
+        if not path.exists():
+            self._path.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path / f".{uuid.uuid4().hex}"
+            if source.is_dir():
+                shutil.copytree(source, tmp_path)
+            else:
+                shutil.copyfile(source, tmp_path)
+            if self._mode in {"hardlink", "symlink"}:
+                _make_read_only(tmp_path)
+            try:
+                tmp_path.rename(path)
+            except OSError:
+                # Another process stored the same data:
+                if tmp_path.is_dir():
+                    shutil.rmtree(tmp_path)
+                else:
+                    tmp_path.unlink()
+        self._stored[source] = path
+        return path
+
+
+def _digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    files = (
+        sorted(item for item in path.rglob("*") if item.is_file())
+        if path.is_dir()
+        else [path]
+    )
+    for file in files:
+        digest.update(str(file.relative_to(path)).encode() + b"\0")
+        with file.open("rb") as file_obj:
+            while block := file_obj.read(_BLOCK_SIZE):
+                digest.update(block)
+    # Files and directories must not share a digest:
+    digest.update(b"d" if path.is_dir() else b"f")
+    return digest.hexdigest()
+
+
+def _make_read_only(path: Path) -> None:
+    files = (
+        [item for item in path.rglob("*") if item.is_file()]
+        if path.is_dir()
+        else [path]
+    )
+    for file in files:
+        file.chmod(stat.S_IMODE(file.stat().st_mode) & ~0o222)
+
+
+def _install(source: Path, target: Path, mode: _Mode) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.is_symlink() or target.is_file():
+        target.unlink()
+    elif target.is_dir():
+        shutil.rmtree(target)
+    if mode == "symlink":
+        target.symlink_to(source, target_is_directory=source.is_dir())
+    elif source.is_dir():
+        for root, _, files in os.walk(source):
+            target_dir = target / Path(root).relative_to(source)
+            target_dir.mkdir(parents=True, exist_ok=True)
+            for file in files:
+                _install_file(Path(root) / file, target_dir / file, mode)
+    else:
+        _install_file(source, target, mode)
+
+
+def _install_file(source: Path, target: Path, mode: _Mode) -> None:
+    if mode == "hardlink":
+        try:
+            target.hardlink_to(source)
+        except OSError:
+            shutil.copyfile(source, target)
+    elif mode == "reflink":
+        with source.open("rb") as src, target.open("wb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            except OSError:
+                shutil.copyfileobj(src, dst, _BLOCK_SIZE)
+    else:
+        shutil.copyfile(source, target)
@@ -0,0 +1,117 @@
+"""This module implements the recording of batch latencies."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from ert.ensemble_evaluator.snapshot import EnsembleSnapshot
+
+
+@dataclass(frozen=True, slots=True)
+class _BatchLatency:
+    """Timing of the evaluation of a batch.
+
+    Attributes:
+        batch_id:     The ID of the batch.
+        realizations: The number of evaluated realizations.
+        total:        Wall time of the ensemble evaluation in seconds.
+        busy:         Time from the first start to the last end of a realization.
+        overhead:     Time spent outside the realizations.
+        queue_wait:   Mean time from the start of the evaluation to the start of
+                      a realization.
+        run_time:     Mean run time of a realization.
+    """
+
+    batch_id: int
+    realizations: int
+    total: float
+    busy: float
+    overhead: float
+    queue_wait: float
+    run_time: float
+
+
+class _LatencyRecorder:
+    """Record the latency of the ensemble evaluation of each batch."""
+
+    def __init__(self) -> None:
+        self._latencies: list[_BatchLatency] = []
+
+    def record(
+        self, batch_id: int, total: float, snapshot: EnsembleSnapshot
+    ) -> _BatchLatency:
+        """Record the latency of a batch evaluation.
+
+        Args:
+            batch_id: The ID of the batch.
+            total:    The wall time of the evaluation.
+            snapshot: The snapshot of the ensemble after the evaluation.
+
+        Returns:
+            The recorded latency.
+        """
+        starts = [
+            _to_datetime(real["start_time"])
+            for real in snapshot.reals.values()
+            if real.get("start_time") is not None
+        ]
+        ends = [
+            _to_datetime(real["end_time"])
+            for real in snapshot.reals.values()
+            if real.get("end_time") is not None
+        ]
+        busy = (
+            min(total, (max(ends) - min(starts)).total_seconds())
+            if starts and ends
+            else 0.0
+        )
+        started = datetime.now().astimezone() - timedelta(seconds=total)
+        waits = [max((start - started).total_seconds(), 0.0) for start in starts]
+        run_times = [
+            (
+                _to_datetime(real["end_time"]) - _to_datetime(real["start_time"])
+            ).total_seconds()
+            for real in snapshot.reals.values()
+            if real.get("start_time") is not None and real.get("end_time") is not None
+        ]
+        latency = _BatchLatency(
+            batch_id=batch_id,
+            realizations=len(starts),
+            total=total,
+            busy=busy,
+            overhead=total - busy,
+            queue_wait=sum(waits) / len(waits) if waits else 0.0,
+            run_time=sum(run_times) / len(run_times) if run_times else 0.0,
+        )
+        self._latencies.append(latency)
+        return latency
+
+    def report(self, path: Path) -> None:
+        """Write the recorded latencies to a JSON file."""
+        if not self._latencies:
+            return
+        overheads = [item.overhead for item in self._latencies]
+        report = {
+            "batches": len(self._latencies),
+            "total": sum(item.total for item in self._latencies),
+            "overhead": sum(overheads),
+            "mean_overhead": sum(overheads) / len(overheads),
+            "max_overhead": max(overheads),
+            "latencies": [asdict(item) for item in self._latencies],
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as file_obj:
+            json.dump(report, file_obj, indent=2)
+
+
+def _to_datetime(value: datetime | str) -> datetime:
+    # Snapshot times may be stored as ISO 8601 strings, and may be naive:
+    return (
+        datetime.fromisoformat(value) if isinstance(value, str) else value
+    ).astimezone()
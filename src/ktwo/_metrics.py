@@ -0,0 +1,289 @@
+"""This module implements the export of live throughput metrics."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, Literal, TextIO
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, PositiveInt
+
+from ._timing import _get_rss, _SpanRecorder
+
+if TYPE_CHECKING:
+    from everest.config import EverestConfig
+    from ropt.plan import Event
+
+    from ._latency import _BatchLatency
+    from ._timing import _MemorySample, _Span
+
+_QUANTILES: Final = (0.5, 0.9, 0.99)
+
+_DEFAULT_FILES: Final = {"jsonl": "metrics.jsonl", "prometheus": "k2.prom"}
+
+
+class K2MetricsConfig(BaseModel):
+    """Configuration of the export of live throughput metrics.
+
+    While a plan runs, the metrics are written after each evaluation, either
+    appended as a JSON record per line, or as a Prometheus textfile that is
+    replaced atomically, for instance to be scraped by the textfile collector
+    of a node exporter.
+
+    Rates and latencies are computed over a window of the most recent batches,
+    counts and hit rates over the whole run.
+
+    Attributes:
+        format: The format of the metrics file.
+        path:   Path of the metrics file, relative to the Everest config, by
+                default stored in the optimization output directory.
+        window: Number of recent batches used for rates and latencies.
+    """
+
+    format: Literal["jsonl", "prometheus"] = "jsonl"
+    path: str | None = None
+    window: PositiveInt = 20
+
+    model_config = ConfigDict(
+        extra="forbid",
+        validate_default=True,
+        frozen=True,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class _BatchMetrics:
+    """Metrics of a single batch.
+
+    Attributes:
+        start:       The start time, as returned by `time.perf_counter`.
+        end:         The end time, as returned by `time.perf_counter`.
+        evaluations: The number of requested evaluations.
+        cached:      The number of evaluations found in the cache.
+        predicted:   The number of evaluations predicted by the surrogate.
+        simulations: The number of simulated evaluations.
+        failed:      The number of failed simulations.
+        restarted:   If the results were restored from a previous run.
+    """
+
+    start: float
+    end: float
+    evaluations: int
+    cached: int
+    predicted: int
+    simulations: int
+    failed: int
+    restarted: bool
+
+
+class _Metrics(_SpanRecorder):
+    """Collect throughput metrics, and write them to a file.
+
+    The metrics are also a span recorder, which only keeps the total time of
+    the result handlers.
+    """
+
+    def __init__(self, config: K2MetricsConfig, everest_config: EverestConfig) -> None:
+        super().__init__()
+        self._format = config.format
+        self._path = (
+            Path(everest_config.optimization_output_dir) / _DEFAULT_FILES[config.format]
+            if config.path is None
+            else Path(everest_config.config_directory) / config.path
+        )
+        self._batches: deque[_BatchMetrics] = deque(maxlen=config.window)
+        self._latencies: deque[_BatchLatency] = deque(maxlen=config.window)
+        self._totals = dict.fromkeys(
+            (
+                "batches",
+                "restarted",
+                "evaluations",
+                "cached",
+                "predicted",
+                "simulations",
+                "failed",
+            ),
+            0,
+        )
+        self._handlers: dict[str, float] = {}
+        self._file: TextIO | None = None
+
+    def add(self, span: _Span) -> None:
+        """Add the duration of a result handler span."""
+        if span.name.startswith("handler:"):
+            name = span.name.partition(":")[2]
+            with self._lock:
+                self._handlers[name] = self._handlers.get(name, 0.0) + span.duration
+
+    def add_sample(self, sample: _MemorySample) -> None:
+        """Ignore memory samples, the current memory use is reported."""
+
+    def add_batch(self, batch: _BatchMetrics) -> None:
+        """Add the metrics of a batch."""
+        self._batches.append(batch)
+        self._totals["batches"] += 1
+        self._totals["restarted"] += batch.restarted
+        self._totals["evaluations"] += batch.evaluations
+        self._totals["cached"] += batch.cached
+        self._totals["predicted"] += batch.predicted
+        self._totals["simulations"] += batch.simulations
+        self._totals["failed"] += batch.failed
+
+    def add_latency(self, latency: _BatchLatency) -> None:
+        """Add the queue and run times of an ensemble evaluation."""
+        self._latencies.append(latency)
+
+    def handle_event(self, event: Event) -> None:  # noqa: ARG002
+        """Write the metrics, called when an evaluation is finished."""
+        if self._batches:
+            self.write()
+
+    def write(self) -> None:
+        """Write the current metrics to the metrics file."""
+        metrics = self._get_metrics()
+        if self._format == "prometheus":
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            # Replace the file atomically, it may be read at any time:
+            tmp_path = self._path.with_name(f".{self._path.name}.{uuid.uuid4().hex}")
+            tmp_path.write_text(_format_prometheus(metrics), encoding="utf-8")
+            tmp_path.replace(self._path)
+        else:
+            if self._file is None:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self._path.open("a", encoding="utf-8")
+            self._file.write(json.dumps(metrics) + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        """Close the metrics file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _get_metrics(self) -> dict[str, Any]:
+        totals = self._totals
+        # Restored batches take no time, and would inflate the rates:
+        batches = [batch for batch in self._batches if not batch.restarted]
+        elapsed = time.perf_counter() - batches[0].start if batches else 0.0
+        simulations = sum(batch.simulations for batch in batches)
+        latencies = np.array([batch.end - batch.start for batch in batches])
+        with self._lock:
+            handlers = dict(self._handlers)
+        return {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "pid": os.getpid(),
+            **totals,
+            "simulations_per_minute": (
+                60.0 * simulations / elapsed if elapsed > 0.0 else 0.0
+            ),
+            "cache_hit_rate": _ratio(totals["cached"], totals["evaluations"]),
+            "restart_hit_rate": _ratio(totals["restarted"], totals["batches"]),
+            "batch_latency": {
+                str(quantile): float(np.quantile(latencies, quantile))
+                if latencies.size
+                else 0.0
+                for quantile in _QUANTILES
+            },
+            "queue_wait": _mean([item.queue_wait for item in self._latencies]),
+            "run_time": _mean([item.run_time for item in self._latencies]),
+            "handler_time": handlers,
+            "rss": _get_rss(),
+        }
+
+
+def _ratio(count: int, total: int) -> float:
+    return count / total if total > 0 else 0.0
+
+
+def _mean(values: list[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def _format_prometheus(metrics: dict[str, Any]) -> str:
+    lines: list[str] = []
+
+    def _add(
+        name: str,
+        kind: str,
+        description: str,
+        values: dict[str, float] | float,
+        label: str = "",
+    ) -> None:
+        lines.append(f"# HELP k2_{name} {description}")
+        lines.append(f"# TYPE k2_{name} {kind}")
+        if isinstance(values, dict):
+            lines.extend(
+                f'k2_{name}{{{label}="{key}"}} {value}' for key, value in values.items()
+            )
+        else:
+            lines.append(f"k2_{name} {values}")
+
+    _add("batches_total", "counter", "Evaluated batches.", metrics["batches"])
+    _add(
+        "evaluations_total",
+        "counter",
+        "Requested evaluations.",
+        metrics["evaluations"],
+    )
+    _add(
+        "simulations_total", "counter", "Simulated evaluations.", metrics["simulations"]
+    )
+    _add(
+        "failed_realizations_total",
+        "counter",
+        "Failed simulations.",
+        metrics["failed"],
+    )
+    _add(
+        "simulations_per_minute",
+        "gauge",
+        "Simulation rate over recent batches.",
+        metrics["simulations_per_minute"],
+    )
+    _add(
+        "cache_hit_ratio",
+        "gauge",
+        "Fraction of evaluations found in the cache.",
+        metrics["cache_hit_rate"],
+    )
+    _add(
+        "restart_hit_ratio",
+        "gauge",
+        "Fraction of batches restored from a previous run.",
+        metrics["restart_hit_rate"],
+    )
+    _add(
+        "batch_latency_seconds",
+        "gauge",
+        "Batch latency quantiles over recent batches.",
+        metrics["batch_latency"],
+        "quantile",
+    )
+    _add(
+        "queue_wait_seconds",
+        "gauge",
+        "Mean time realizations wait before running, over recent batches.",
+        metrics["queue_wait"],
+    )
+    _add(
+        "run_time_seconds",
+        "gauge",
+        "Mean run time of realizations, over recent batches.",
+        metrics["run_time"],
+    )
+    _add(
+        "handler_seconds_total",
+        "counter",
+        "Time spent in result handlers.",
+        metrics["handler_time"],
+        "handler",
+    )
+    _add("resident_memory_bytes", "gauge", "Resident set size.", metrics["rss"])
+    return "\n".join(lines) + "\n"
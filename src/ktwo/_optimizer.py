@@ -4,11 +4,13 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from everest.config import EverestConfig
-from everest.optimizer.everest2ropt import everest2ropt
 from ropt.plugins.plan.optimizer import DefaultOptimizerStep
 
+from ._timing import _span
+from ._utils import _get_enopt_config, _get_everest_config
+
 if TYPE_CHECKING:
+    from everest.config import EverestConfig
     from ropt.config.enopt import EnOptConfig
     from ropt.config.plan import PlanStepConfig
     from ropt.plan import Event, Plan
@@ -33,8 +35,10 @@ class K2OptimizerStep(DefaultOptimizerStep):
         Returns:
             The parsed configuration.
         """
-        self._everest_config = EverestConfig.model_validate(self.plan.eval(config))
-        return everest2ropt(self._everest_config)
+        config_dict = self.plan.eval(config)
+        with _span("config_validation"):
+            self._everest_config = _get_everest_config(config_dict)
+            return _get_enopt_config(config_dict)
 
     def emit_event(self, event: Event) -> None:
         """Emit an event.
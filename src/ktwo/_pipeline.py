@@ -0,0 +1,39 @@
+"""This module implements background processing of evaluation results."""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class _BackgroundTasks:
+    """Run tasks in a background thread, in submission order.
+
+    This is used to store the results of a batch, while the optimizer already
+    continues with the next one. Tasks are executed one at a time, in the order
+    they were submitted. Errors raised by a task are re-raised by the next call
+    to `wait` or `close`.
+    """
+
+    def __init__(self) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="k2-background"
+        )
+        self._pending: list[Future[Any]] = []
+
+    def submit(self, function: Callable[..., Any], *args: Any) -> None:  # noqa: ANN401
+        """Submit a task for execution in the background."""
+        self._pending.append(self._executor.submit(function, *args))
+
+    def wait(self) -> None:
+        """Wait until all submitted tasks are finished."""
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def close(self) -> None:
+        """Wait for all submitted tasks, and stop the background thread."""
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown()
@@ -10,31 +10,54 @@ from ropt.config.plan import PlanStepConfig, ResultHandlerConfig
 from ropt.plan import Plan
 from ropt.plugins.plan.base import PlanPlugin, PlanStep, ResultHandler
 
-from ._functions import _results2dict
+from ._batch_timeout import K2BatchTimeoutStep
+from ._functions import _results2arrays, _results2dict
 from ._optimizer import K2OptimizerStep
+from ._results_arrow import K2ResultsArrowHandler
 from ._results_table import K2ResultsTableHandler
+from ._save_arrays import K2SaveArraysStep
+from ._surrogate import K2SurrogateStep
 from ._workflow_job import K2WorkflowJobStep
 
 if TYPE_CHECKING:
+    from ert.config import ErtConfig
     from ert.storage import Storage
     from everest.config import EverestConfig
 
+    from ._batch_timeout import _BatchTimeout
+    from ._surrogate import _Surrogate
+
 _STEP_OBJECTS: Final[dict[str, Type[PlanStep]]] = {
+    "batch_timeout": K2BatchTimeoutStep,
     "optimizer": K2OptimizerStep,
+    "save_arrays": K2SaveArraysStep,
+    "surrogate": K2SurrogateStep,
     "workflow_job": K2WorkflowJobStep,
 }
 
 _RESULT_HANDLER_OBJECTS: Final[dict[str, Type[ResultHandler]]] = {
     "results_table": K2ResultsTableHandler,
+    "results_arrow": K2ResultsArrowHandler,
 }
 
 
 class K2PlanPlugin(PlanPlugin):
     """Default plan plugin class."""
 
-    def __init__(self, everest_config: EverestConfig, storage: Storage) -> None:
+    def __init__(
+        self,
+        everest_config: EverestConfig,
+        ert_config: ErtConfig,
+        storage: Storage,
+        batch_timeout: _BatchTimeout,
+        surrogate: _Surrogate,
+    ) -> None:
         self._everest_config = everest_config
+        self._ert_config = ert_config
         self._storage = storage
+        self._batch_timeout = batch_timeout
+        self._surrogate = surrogate
+        self._arrow_handlers: list[K2ResultsArrowHandler] = []
 
     @singledispatchmethod
     def create(  # type: ignore[override]
@@ -55,7 +78,11 @@ class K2PlanPlugin(PlanPlugin):
     def _create_step(self, config: PlanStepConfig, plan: Plan) -> PlanStep:
         _, _, step_name = config.run.lower().rpartition("/")
         if step_name == "workflow_job":
-            return K2WorkflowJobStep(config, plan, self._everest_config, self._storage)
+            return K2WorkflowJobStep(config, plan, self._ert_config, self._storage)
+        if step_name == "batch_timeout":
+            return K2BatchTimeoutStep(config, plan, self._batch_timeout)
+        if step_name == "surrogate":
+            return K2SurrogateStep(config, plan, self._surrogate)
         step_obj = _STEP_OBJECTS.get(step_name)
         if step_obj is not None:
             return step_obj(config, plan)
@@ -70,12 +97,22 @@ class K2PlanPlugin(PlanPlugin):
         path = Path(self._everest_config.optimization_output_dir)
         if name == "results_table":
             return K2ResultsTableHandler(config, path)
+        if name == "results_arrow":
+            handler = K2ResultsArrowHandler(config, path)
+            self._arrow_handlers.append(handler)
+            return handler
         obj = _RESULT_HANDLER_OBJECTS.get(name)
         if obj is not None:
             return obj(config, plan)
         msg = f"Unknown results handler object type: {config.run}"
         raise TypeError(msg)
 
+    def close(self) -> None:
+        """Close the files of the result handlers, at the end of a plan."""
+        for handler in self._arrow_handlers:
+            handler.close()
+        self._arrow_handlers = []
+
     def is_supported(self, method: str) -> bool:
         return (method.lower() in _RESULT_HANDLER_OBJECTS) or (
             method.lower() in _STEP_OBJECTS
@@ -85,4 +122,5 @@ class K2PlanPlugin(PlanPlugin):
     def functions(self) -> dict[str, Any]:
         return {
             "results2dict": _results2dict,
+            "results2arrays": _results2arrays,
         }
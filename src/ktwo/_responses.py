@@ -0,0 +1,150 @@
+"""This module implements bulk loading of simulation results."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Final, Sequence
+
+import numpy as np
+import polars as pl
+
+if TYPE_CHECKING:
+    from ert.storage import Ensemble
+    from numpy.typing import NDArray
+
+_LOGGER = logging.getLogger(__name__)
+
+_COLUMNS: Final = ("realization", "response_key", "values")
+
+
+@dataclass(frozen=True, slots=True)
+class _SimulationResults:
+    """The results of the simulations of a batch.
+
+    Attributes:
+        columns: The column of each result in the values.
+        values:  The values, one row per simulation, `NaN` if a simulation failed.
+    """
+
+    columns: dict[str, int]
+    values: NDArray[np.float64]
+
+    def get(self, names: Sequence[str]) -> NDArray[np.float64]:
+        """Return the values of a set of results, one column per result."""
+        return self.values[:, [self.columns[name] for name in names]]
+
+    @property
+    def failed(self) -> int:
+        """Return the number of simulations without results."""
+        return int(np.count_nonzero(np.all(np.isnan(self.values), axis=1)))
+
+
+def _load_results(
+    ensemble: Ensemble,
+    result_names: Sequence[str],
+    function_aliases: dict[str, str],
+    successful: Sequence[bool],
+) -> _SimulationResults:
+    """Load the results of the simulations of an ensemble.
+
+    The responses of each type are read for all successful simulations in a
+    single scan, reading only the needed columns and rows. The first value of
+    each response is used, as ERT does.
+
+    The scan relies on the layout of ERT storage, a parquet file per response
+    type in the directory of each realization. If the files are not found in
+    that layout, the responses are loaded via `Ensemble.load_responses`, which
+    is slower, but does not depend on the layout.
+
+    Args:
+        ensemble:         The ensemble.
+        result_names:     The names of the results.
+        function_aliases: Result names that refer to other results.
+        successful:       For each simulation, if it was successful.
+
+    Returns:
+        The simulation results.
+    """
+    columns = {name: idx for idx, name in enumerate(result_names)}
+    values = np.full((len(successful), len(columns)), np.nan, dtype=np.float64)
+    realizations = tuple(int(sim_id) for sim_id in np.flatnonzero(successful))
+    for sim_id in np.flatnonzero(np.logical_not(successful)):
+        _LOGGER.error("Simulation %d failed.", sim_id)
+
+    if realizations:
+        response_types = ensemble.experiment.response_key_to_response_type
+        names_by_type: dict[str, list[str]] = {}
+        for name in columns:
+            if name not in response_types:
+                msg = f"{name} is not a response"
+                raise ValueError(msg)
+            names_by_type.setdefault(response_types[name], []).append(name)
+        for response_type, names in names_by_type.items():
+            paths = _get_response_paths(ensemble, response_type, realizations)
+            if paths is None:
+                frame = _load_responses(ensemble, names, realizations)
+            else:
+                frame = _scan_responses(paths, names)
+            missing = len(realizations) * len(names) - frame.height
+            if missing > 0:
+                msg = f"Missing {missing} responses in ensemble {ensemble.name}"
+                raise KeyError(msg)
+            values[
+                frame["realization"].to_numpy(),
+                frame["response_key"].replace_strict(columns).to_numpy(),
+            ] = frame["values"].to_numpy()
+
+    for name, alias in function_aliases.items():
+        columns[name] = columns[alias]
+    return _SimulationResults(columns=columns, values=values)
+
+
+def _get_response_paths(
+    ensemble: Ensemble, response_type: str, realizations: Sequence[int]
+) -> list[Path] | None:
+    # Find the parquet files of a response type, None if the ERT storage
+    # layout is not as expected:
+    realization_dir = getattr(ensemble, "_realization_dir", None)
+    if not callable(realization_dir):
+        return None
+    paths = [
+        Path(realization_dir(sim_id)) / f"{response_type}.parquet"
+        for sim_id in realizations
+    ]
+    if not all(path.exists() for path in paths):
+        return None
+    if not set(_COLUMNS).issubset(pl.scan_parquet(paths[0]).collect_schema()):
+        return None
+    return paths
+
+
+def _scan_responses(paths: list[Path], names: Sequence[str]) -> pl.DataFrame:
+    # A single scan of all files is much faster than ERT, which concatenates a
+    # scan per file. Filtering after reading is faster than pushing the filter
+    # down into the scan, since the files are typically small:
+    return (
+        pl.scan_parquet(paths)
+        .select(_COLUMNS)
+        .collect()
+        .lazy()
+        .filter(pl.col("response_key").is_in(names))
+        .group_by("realization", "response_key", maintain_order=True)
+        .agg(pl.col("values").first())
+        .collect()
+    )
+
+
+def _load_responses(
+    ensemble: Ensemble, names: Sequence[str], realizations: tuple[int, ...]
+) -> pl.DataFrame:
+    _LOGGER.debug("Responses not found in storage, loading them via ERT")
+    return (
+        pl.concat(
+            ensemble.load_responses(name, realizations).select(_COLUMNS)
+            for name in names
+        )
+        .group_by("realization", "response_key", maintain_order=True)
+        .agg(pl.col("values").first())
+    )
@@ -0,0 +1,128 @@
+"""This module implements the restart journal of k2."""
+
+from __future__ import annotations
+
+import mmap
+import os
+import pickle
+import struct
+import zlib
+from typing import TYPE_CHECKING, Any, BinaryIO, Final
+
+from ._timing import _span
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# Record header: magic, batch ID, payload length, payload CRC32:
+_HEADER: Final = struct.Struct("<4sQQI")
+_MAGIC: Final = b"K2RJ"
+
+
+class _RestartJournal:
+    """An append-only journal storing restart data.
+
+    Each record consists of a fixed-size header, followed by a pickled payload.
+    The header contains the batch ID, the length of the payload and its CRC32
+    checksum. On the first lookup, the index of the journal is built by
+    scanning the headers only, after which payloads are read lazily from a
+    memory-mapped view of the file.
+
+    A truncated, or otherwise corrupt, record at the end of the file, e.g. due
+    to a crash during a write, terminates the scan and is cut off before new
+    records are appended. Corrupt records elsewhere are skipped on lookup.
+    """
+
+    def __init__(self, path: Path, *, sync_interval: int = 16) -> None:
+        self._path = path
+        self._sync_interval = sync_interval
+        self._index: dict[int, tuple[int, int, int]] | None = None
+        self._end = 0
+        self._mmap: mmap.mmap | None = None
+        self._file: BinaryIO | None = None
+        self._unsynced = 0
+
+    def get(self, batch_id: int) -> dict[str, Any] | None:
+        """Retrieve the restart data of a batch, if available."""
+        index = self._load_index()
+        if batch_id not in index or self._mmap is None:
+            return None
+        offset, length, crc = index[batch_id]
+        payload = self._mmap[offset : offset + length]
+        if zlib.crc32(payload) != crc:
+            return None
+        data: dict[str, Any] = pickle.loads(payload)  # noqa: S301
+        return data
+
+    def append(self, batch_id: int, data: dict[str, Any]) -> None:
+        """Append the restart data of a batch to the journal."""
+        with _span("restart_write"):
+            self._append(batch_id, data)
+
+    def _append(self, batch_id: int, data: dict[str, Any]) -> None:
+        if self._file is None:
+            self._load_index()
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self._path.open("ab")
+            self._file.truncate(self._end)
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.write(
+            _HEADER.pack(_MAGIC, batch_id, len(payload), zlib.crc32(payload))
+        )
+        self._file.write(payload)
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self._sync_interval:
+            self._sync()
+
+    def close(self) -> None:
+        """Flush pending records to disk and close the journal."""
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _sync(self) -> None:
+        assert self._file is not None
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def _load_index(self) -> dict[int, tuple[int, int, int]]:
+        if self._index is not None:
+            return self._index
+        self._index = {}
+        if not self._path.exists():
+            return self._index
+        with self._path.open("rb") as file_obj:
+            size = os.fstat(file_obj.fileno()).st_size
+            records: list[tuple[int, int, int, int]] = []
+            offset = 0
+            while offset + _HEADER.size <= size:
+                file_obj.seek(offset)
+                magic, batch_id, length, crc = _HEADER.unpack(
+                    file_obj.read(_HEADER.size)
+                )
+                if magic != _MAGIC or offset + _HEADER.size + length > size:
+                    break
+                records.append((batch_id, offset + _HEADER.size, length, crc))
+                offset += _HEADER.size + length
+            # A torn write may leave a complete, but corrupt, last record:
+            if records:
+                _, start, length, crc = records[-1]
+                file_obj.seek(start)
+                if zlib.crc32(file_obj.read(length)) != crc:
+                    records.pop()
+                    offset = start - _HEADER.size
+            self._index = {
+                batch_id: (start, length, crc)
+                for batch_id, start, length, crc in records
+            }
+            self._end = offset
+            if self._end > 0:
+                self._mmap = mmap.mmap(
+                    file_obj.fileno(), self._end, access=mmap.ACCESS_READ
+                )
+        return self._index
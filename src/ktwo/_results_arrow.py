@@ -0,0 +1,218 @@
+"""The columnar results output of k2."""
+
+from copy import deepcopy
+from importlib.util import find_spec
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, Literal, Sequence
+
+from pydantic import BaseModel, ConfigDict, Field
+from ropt.config.plan import ResultHandlerConfig
+from ropt.config.validated_types import ItemOrSet
+from ropt.enums import EventType
+from ropt.plan import Event
+from ropt.plugins.plan.base import ResultHandler
+from ropt.report import ResultsDataFrame
+from ropt.results import Results
+
+from ._results_table import _COLUMNS, _TABLE_TYPE_MAP, _get_column_keys
+from ._timing import _span
+from ._utils import _get_names, _maximize
+
+_HAVE_PYARROW: Final = find_spec("pyarrow") is not None
+
+if TYPE_CHECKING or _HAVE_PYARROW:
+    import pyarrow as pa
+
+
+class K2ResultsArrowHandler(ResultHandler):
+    """The k2 columnar results handler object.
+
+    This handler stores the same data as the results table handler in Arrow IPC
+    stream files, with typed columns named after the column titles, joined by a
+    `/` with the variable or function name, if applicable. Each evaluation
+    event is appended as a single record batch, and the files can be read while
+    the optimization is running, for instance using memory-mapping:
+
+    ```py
+    with pa.memory_map("results.arrow") as source:
+        table = pa.ipc.open_stream(source).read_all()
+    ```
+    """
+
+    class K2ResultsArrowHandlerWith(BaseModel):
+        tags: ItemOrSet[str]
+        name: str | None = None
+        type_: Literal[
+            "results", "gradients", "perturbations", "simulations", "defaults"
+        ] = Field(default="defaults", alias="type")
+        metadata: dict[str, str] = {}
+        compression: Literal["lz4", "zstd"] | None = "zstd"
+
+        model_config = ConfigDict(
+            extra="forbid",
+            validate_default=True,
+            frozen=True,
+        )
+
+    def __init__(self, config: ResultHandlerConfig, path: Path) -> None:
+        if not _HAVE_PYARROW:
+            msg = "The results_arrow handler requires the `pyarrow` module"
+            raise NotImplementedError(msg)
+
+        self._with = self.K2ResultsArrowHandlerWith.model_validate(config.with_)
+        if self._with.type_ == "defaults":
+            types = ["results", "gradients", "perturbations", "simulations"]
+            names = [f"{type_}.arrow" for type_ in types]
+        else:
+            types = [self._with.type_]
+            names = [
+                f"{self._with.type_}.arrow"
+                if self._with.name is None
+                else self._with.name
+            ]
+
+        self._stores = []
+        for type_, name in zip(types, names, strict=False):
+            columns = deepcopy(_COLUMNS[type_])
+            for key, title in self._with.metadata.items():
+                columns[f"metadata.{key}"] = title
+            self._stores.append(
+                _ArrowStore(
+                    columns,
+                    path / name,
+                    table_type=_TABLE_TYPE_MAP[type_],
+                    compression=self._with.compression,
+                )
+            )
+
+    def handle_event(self, event: Event) -> Event:
+        """Handle an event."""
+        if (
+            event.event_type
+            in {
+                EventType.FINISHED_EVALUATION,
+                EventType.FINISHED_EVALUATOR_STEP,
+            }
+            and "results" in event.data
+            and (event.tags & self._with.tags)
+        ):
+            names = _get_names(event.data.get("everest_config"))
+            results = [_maximize(item) for item in event.data["results"]]
+            for store in self._stores:
+                added = False
+                for item in results:
+                    if store.add_results(item, names):
+                        added = True
+                if added:
+                    with _span("results_arrow"):
+                        store.save()
+        return event
+
+    def close(self) -> None:
+        """Close the stream files, writing their end-of-stream markers."""
+        for store in self._stores:
+            store.close()
+
+
+class _ArrowStore:
+    """Append results to an Arrow IPC stream file, one record batch per save.
+
+    If new columns appear, or if the type of a column changes, the file is
+    rewritten with the new schema. The existing record batches are copied one
+    by one, with missing values set to null.
+    """
+
+    def __init__(
+        self,
+        columns: dict[str, str],
+        path: Path,
+        *,
+        table_type: Literal["functions", "gradients"],
+        compression: Literal["lz4", "zstd"] | None,
+    ) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._columns = columns
+        self._path = path
+        self._table_type = table_type
+        self._options = pa.ipc.IpcWriteOptions(compression=compression)
+        self._data_frame = ResultsDataFrame(set(columns), table_type=table_type)
+        self._sink: pa.OSFile | None = None
+        self._writer: pa.ipc.RecordBatchStreamWriter | None = None
+        self._schema: pa.Schema | None = None
+
+    def add_results(
+        self,
+        results: Results,
+        names: dict[str, Sequence[str | int] | None] | None = None,
+    ) -> bool:
+        """Add results to the record batch that is written by the next save."""
+        return self._data_frame.add_results(results, names)
+
+    def save(self) -> None:
+        """Write the results added since the last save as a record batch."""
+        frame = self._data_frame.frame.reset_index()
+        self._data_frame = ResultsDataFrame(
+            set(self._columns), table_type=self._table_type
+        )
+        keys = _get_column_keys(frame, self._columns)
+        if frame.empty or not keys:
+            return
+        batch = pa.RecordBatch.from_pydict(
+            {
+                self._get_label(key): pa.array(frame[key].to_numpy(), from_pandas=True)
+                for key in keys
+            }
+        )
+        if self._writer is None or self._schema is None:
+            self._open(batch.schema)
+        else:
+            schema = pa.unify_schemas(
+                [self._schema, batch.schema], promote_options="permissive"
+            )
+            if not schema.equals(self._schema):
+                self._rewrite(schema)
+        assert self._writer is not None
+        assert self._schema is not None
+        self._writer.write_batch(_conform(batch, self._schema))
+
+    def close(self) -> None:
+        """Close the writer and the file."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def _get_label(self, key: str | tuple[Any, ...]) -> str:
+        if isinstance(key, tuple):
+            return "/".join([self._columns[key[0]], *(str(item) for item in key[1:])])
+        return self._columns[key]
+
+    def _open(self, schema: pa.Schema) -> None:
+        self._schema = schema
+        self._sink = pa.OSFile(str(self._path), "wb")
+        self._writer = pa.ipc.new_stream(self._sink, schema, options=self._options)
+
+    def _rewrite(self, schema: pa.Schema) -> None:
+        self.close()
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        self._path.replace(tmp_path)
+        self._open(schema)
+        assert self._writer is not None
+        with pa.memory_map(str(tmp_path)) as source:
+            for batch in pa.ipc.open_stream(source):
+                self._writer.write_batch(_conform(batch, schema))
+        tmp_path.unlink()
+
+
+def _conform(batch: pa.RecordBatch, schema: pa.Schema) -> pa.RecordBatch:
+    return pa.RecordBatch.from_arrays(
+        [
+            batch.column(field.name).cast(field.type)
+            if field.name in batch.schema.names
+            else pa.nulls(batch.num_rows, field.type)
+            for field in schema
+        ],
+        schema=schema,
+    )
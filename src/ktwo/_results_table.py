@@ -1,19 +1,23 @@
 """The report functionality of k2."""
 
 from copy import deepcopy
+from dataclasses import dataclass
+from itertools import count
 from pathlib import Path
-from typing import Final, Literal
+from typing import Any, Final, Iterator, Literal, Sequence
 
+import pandas as pd
 from pydantic import BaseModel, ConfigDict, Field
 from ropt.config.plan import ResultHandlerConfig
 from ropt.config.validated_types import ItemOrSet
 from ropt.enums import EventType
 from ropt.plan import Event
 from ropt.plugins.plan.base import ResultHandler
-from ropt.report import ResultsTable
-from ropt.results import convert_to_maximize
+from ropt.report import ResultsDataFrame, ResultsTable
+from ropt.results import Results
 
-from ._utils import _get_names
+from ._timing import _span
+from ._utils import _get_names, _maximize
 
 _TABLE_TYPE_MAP: Final[dict[str, Literal["functions", "gradients"]]] = {
     "results": "functions",
@@ -80,6 +84,7 @@ class K2ResultsTableHandler(ResultHandler):
             "results", "gradients", "perturbations", "simulations", "defaults"
         ] = Field(default="defaults", alias="type")
         metadata: dict[str, str] = {}
+        incremental: bool = False
 
         model_config = ConfigDict(
             extra="forbid",
@@ -100,13 +105,14 @@ class K2ResultsTableHandler(ResultHandler):
                 else self._with.name
             ]
 
-        self._tables = []
+        table_class = _IncrementalTable if self._with.incremental else ResultsTable
+        self._tables: list[ResultsTable | _IncrementalTable] = []
         for type_, name in zip(types, names, strict=False):
             columns = deepcopy(_COLUMNS[type_])
             for key, title in self._with.metadata.items():
                 columns[f"metadata.{key}"] = title
             self._tables.append(
-                ResultsTable(
+                table_class(
                     columns,
                     path / name,
                     table_type=_TABLE_TYPE_MAP[type_],
@@ -126,11 +132,201 @@ class K2ResultsTableHandler(ResultHandler):
             and (event.tags & self._with.tags)
         ):
             names = _get_names(event.data.get("everest_config"))
+            results = [_maximize(item) for item in event.data["results"]]
             for table in self._tables:
                 added = False
-                for item in event.data["results"]:
-                    if table.add_results(convert_to_maximize(item), names):
+                for item in results:
+                    if table.add_results(item, names):
                         added = True
                 if added:
-                    table.save()
+                    with _span("results_table"):
+                        table.save()
         return event
+
+
+@dataclass(frozen=True, slots=True)
+class _Column:
+    key: str | tuple[Any, ...]
+    header: tuple[str, ...]
+    width: int
+    numeric: bool
+
+
+class _IncrementalTable:
+    """A results table that only appends new rows to its file.
+
+    Rows are formatted and written by `save`, after which they are dropped from
+    memory. The file is rewritten only if the set of columns changes, or if a
+    value does not fit in the width of its column. A rewrite reads the existing
+    file line by line, so the memory use does not depend on its size.
+
+    Columns are separated by two spaces and numbers are right-aligned, hence the
+    table can be read with `pandas.read_fwf`, like the tables written by
+    `ropt.report.ResultsTable`.
+    """
+
+    def __init__(
+        self,
+        columns: dict[str, str],
+        path: Path,
+        *,
+        table_type: Literal["functions", "gradients"] = "functions",
+        min_header_len: int | None = None,
+    ) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._columns = columns
+        self._path = path
+        self._table_type = table_type
+        self._min_header_len = min_header_len
+        self._data_frame = ResultsDataFrame(set(columns), table_type=table_type)
+        self._layout: list[_Column] = []
+        self._order: dict[str | tuple[Any, ...], int] = {}
+        self._counter = count()
+
+    def add_results(
+        self,
+        results: Results,
+        names: dict[str, Sequence[str | int] | None] | None = None,
+    ) -> bool:
+        """Add results to the rows that are written by the next save."""
+        return self._data_frame.add_results(results, names)
+
+    def save(self) -> None:
+        """Write the rows added since the last save."""
+        frame = self._data_frame.frame.reset_index()
+        self._data_frame = ResultsDataFrame(
+            set(self._columns), table_type=self._table_type
+        )
+        keys = _get_column_keys(frame, self._columns)
+        if frame.empty or not keys:
+            return
+        cells = {key: _format_cells(frame[key]) for key in keys}
+        layout = self._update_layout(frame, cells)
+        if layout == self._layout:
+            with self._path.open("a", encoding="utf-8") as fp:
+                fp.writelines(_format_rows(layout, cells))
+        else:
+            self._rewrite(layout, cells)
+
+    def _update_layout(
+        self, frame: pd.DataFrame, cells: dict[str | tuple[Any, ...], list[str]]
+    ) -> list[_Column]:
+        columns = {column.key: column for column in self._layout}
+        for key, values in cells.items():
+            header = (
+                (self._columns[key[0]], *(str(item) for item in key[1:]))
+                if isinstance(key, tuple)
+                else tuple(self._columns[key].split("\n"))
+            )
+            width = max(
+                *(len(line) + 2 for line in header), *(len(value) for value in values)
+            )
+            column = columns.get(key)
+            if column is None:
+                self._order[key] = next(self._counter)
+                columns[key] = _Column(
+                    key, header, width, pd.api.types.is_numeric_dtype(frame[key])
+                )
+            elif width > column.width:
+                columns[key] = _Column(key, header, width, column.numeric)
+        group = {key: idx for idx, key in enumerate(self._columns)}
+        return sorted(
+            columns.values(),
+            key=lambda column: (
+                group[column.key[0] if isinstance(column.key, tuple) else column.key],
+                self._order[column.key],
+            ),
+        )
+
+    def _rewrite(
+        self, layout: list[_Column], cells: dict[str | tuple[Any, ...], list[str]]
+    ) -> None:
+        tmp_path = self._path.with_name(self._path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as fp:
+            fp.writelines(_format_header(layout, self._min_header_len))
+            if self._layout and self._path.exists():
+                for line in _read_rows(self._path, self._layout, self._min_header_len):
+                    fp.writelines(_format_rows(layout, _parse_row(self._layout, line)))
+            fp.writelines(_format_rows(layout, cells))
+        tmp_path.replace(self._path)
+        self._layout = layout
+
+
+def _get_column_keys(
+    frame: pd.DataFrame, columns: dict[str, str]
+) -> list[str | tuple[Any, ...]]:
+    # Select the columns of the frame in the order given by the column mapping.
+    # Fields with multiple columns have a tuple as a name, with the field name
+    # as the first element:
+    return [
+        name
+        for key in columns
+        for name in frame.columns.to_numpy()
+        if name == key or (isinstance(name, tuple) and name[0] == key)
+    ]
+
+
+def _format_cells(values: pd.Series) -> list[str]:
+    return [
+        format(value, "g") if isinstance(value, float) else str(value)
+        for value in values.to_numpy()
+    ]
+
+
+def _header_len(layout: list[_Column], min_header_len: int | None) -> int:
+    return max(
+        *(len(column.header) for column in layout),
+        0 if min_header_len is None else min_header_len,
+    )
+
+
+def _format_header(layout: list[_Column], min_header_len: int | None) -> list[str]:
+    lines = [
+        "  ".join(
+            _align(column.header[idx] if idx < len(column.header) else "", column)
+            for column in layout
+        ).rstrip()
+        + "\n"
+        for idx in range(_header_len(layout, min_header_len))
+    ]
+    lines.append("  ".join("-" * column.width for column in layout) + "\n")
+    return lines
+
+
+def _format_rows(
+    layout: list[_Column], cells: dict[str | tuple[Any, ...], list[str]]
+) -> list[str]:
+    row_count = max(len(values) for values in cells.values())
+    return [
+        "  ".join(
+            _align(cells[column.key][idx] if column.key in cells else "", column)
+            for column in layout
+        ).rstrip()
+        + "\n"
+        for idx in range(row_count)
+    ]
+
+
+def _align(value: str, column: _Column) -> str:
+    return value.rjust(column.width) if column.numeric else value.ljust(column.width)
+
+
+def _read_rows(
+    path: Path, layout: list[_Column], min_header_len: int | None
+) -> Iterator[str]:
+    skip = _header_len(layout, min_header_len) + 1
+    with path.open("r", encoding="utf-8") as fp:
+        for idx, line in enumerate(fp):
+            if idx >= skip:
+                yield line.rstrip("\n")
+
+
+def _parse_row(
+    layout: list[_Column], line: str
+) -> dict[str | tuple[Any, ...], list[str]]:
+    row: dict[str | tuple[Any, ...], list[str]] = {}
+    start = 0
+    for column in layout:
+        row[column.key] = [line[start : start + column.width].strip()]
+        start += column.width + 2
+    return row
@@ -2,43 +2,96 @@
 
 from __future__ import annotations
 
+import logging
 import pickle
-import shutil
+import queue
 import sys
-from contextlib import suppress
+import time
+from contextlib import nullcontext, suppress
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Callable
 
 import numpy as np
-from ert.config import QueueSystem
+from ert.config import HookRuntime, QueueSystem
+from ert.enkf_main import create_run_path
 from ert.ensemble_evaluator import EvaluatorServerConfig
-from ert.run_models.everest_run_model import EverestRunModel
+from ert.run_models.base_run_model import BaseRunModel
+from ert.run_models.everest_run_model import EverestRunModel, SimulatorCache
 from everest.config import EverestConfig, ServerConfig
 from everest.detached.jobs.everserver import _configure_loggers
+from everest.optimizer.everest2ropt import everest2ropt
 from everest.simulator.everest_to_ert import everest_to_ert_config
+from everest.strings import EVEREST
 from ropt.enums import EventType
 from ropt.plan import Event, OptimizerContext, Plan
 from ropt.plugins import PluginManager
 
+from ._batch_timeout import _BatchTimeout
+from ._cache import _EvaluationCache
+from ._controls import (
+    _EnsembleView,
+    _export_controls,
+    _get_control_groups,
+    _save_controls,
+)
+from ._inputs import _InputStore
+from ._latency import _LatencyRecorder
+from ._metrics import _BatchMetrics, _Metrics
+from ._pipeline import _BackgroundTasks
 from ._plugins import K2PlanPlugin
+from ._responses import _load_results, _SimulationResults
+from ._restart import _RestartJournal
+from ._runpath import _RunpathCleaner
+from ._storage import _open_lazy_storage, _StorageIndex
+from ._surrogate import _Surrogate
+from ._timing import (
+    _is_recording,
+    _record_spans,
+    _sample_memory,
+    _span,
+    _TimedPluginManager,
+)
 
 if TYPE_CHECKING:
+    from ert.run_arg import RunArg
+    from ert.storage import Ensemble, Storage
     from numpy.typing import NDArray
     from ropt.config.plan import PlanConfig
     from ropt.evaluator import EvaluatorContext, EvaluatorResult
 
+    from ._cache import K2CacheConfig
+    from ._evaluator import _PythonEvaluator
+    from ._inputs import K2InputsConfig
+    from ._metrics import K2MetricsConfig
+    from ._surrogate import _Prediction
+
 
 class K2RunModel(EverestRunModel):
     """The K2 run model."""
 
-    def __init__(self, config: dict[str, Any], *, restart: bool) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        config: dict[str, Any],
+        *,
+        restart: bool,
+        cache: K2CacheConfig | None = None,
+        evaluator: _PythonEvaluator | None = None,
+        inputs: K2InputsConfig | None = None,
+        metrics: K2MetricsConfig | None = None,
+    ) -> None:
         """Initialize the run model.
 
         Args:
-            config: Everest configuration.
+            config:    Everest configuration.
+            restart:   Allow restarting from existing output.
+            cache:     Optional configuration of a persistent evaluation cache.
+            evaluator: Optional Python function, evaluating batches in-process.
+            inputs:    Optional configuration of the installation of input data.
+            metrics:   Optional configuration of the export of live metrics.
         """
         self._everest_config_dict = config
-        everest_config = EverestConfig.model_validate(config)
+        with _span("config_validation"):
+            everest_config = EverestConfig.model_validate(config)
 
         self._restart = restart
         if not self._restart:
@@ -59,16 +112,107 @@ class K2RunModel(EverestRunModel):
             logging_level=everest_config.logging_level,
         )
 
-        self._ert_config = everest_to_ert_config(everest_config)
+        # Input data installed by copying is installed by k2, from a store:
+        self._input_store = (
+            None
+            if inputs is None
+            else _InputStore(inputs, Path(everest_config.output_dir) / ".inputs")
+        )
+        with _span("ert_config"):
+            self._ert_config = everest_to_ert_config(
+                everest_config
+                if self._input_store is None
+                else self._input_store.add_install_data(everest_config)
+            )
+
+        # Determine the state of the ensembles in storage only when needed:
+        self._init_run_model(
+            everest_config, _open_lazy_storage(self._ert_config.ens_path, mode="w")
+        )
+        self._storage_index = _StorageIndex(
+            self._storage, Path(self._ert_config.ens_path) / "k2_index.jsonl"
+        )
 
-        super().__init__(
-            config=self._ert_config,
-            everest_config=everest_config,
-            simulation_callback=lambda _: None,
-            optimization_callback=lambda: None,
+        # Validate the layout of the controls once, they are stored in bulk:
+        self._control_groups = _get_control_groups(
+            everest_config.control_name_tuples, self._parameter_configs
         )
+        self._batch_controls: NDArray[np.float64] | None = None
+        self._batch_geo_ids: list[int] = []
 
         self._restart_data: dict[str, Any] = {}
+        self._restart_journal = _RestartJournal(
+            Path(everest_config.output_dir) / "restart" / "journal.bin"
+        )
+
+        # Replace the in-memory cache with a persistent cache, if configured:
+        self._evaluation_cache = (
+            None if cache is None else _EvaluationCache(cache, everest_config)
+        )
+        if self._evaluation_cache is not None:
+            self._simulator_cache = self._evaluation_cache  # type: ignore[assignment]
+
+        self._latencies = _LatencyRecorder()
+        self._python_evaluator = evaluator
+        self._runpath_cleaner = _RunpathCleaner(
+            Path(everest_config.simulation_dir) / ".trash"
+        )
+        self._background_tasks = _BackgroundTasks()
+        self._batch_timeout = _BatchTimeout()
+        self._surrogate = _Surrogate()
+        self._metrics = None if metrics is None else _Metrics(metrics, everest_config)
+
+    def _init_run_model(self, everest_config: EverestConfig, storage: Storage) -> None:
+        # This follows EverestRunModel.__init__, which opens the storage itself,
+        # but uses the given storage instead:
+        Path(everest_config.log_dir).mkdir(parents=True, exist_ok=True)
+        Path(everest_config.optimization_output_dir).mkdir(parents=True, exist_ok=True)
+        assert everest_config.environment is not None
+        logging.getLogger(EVEREST).info(
+            "Using random seed: %d. To deterministically reproduce this experiment, "
+            "add the above random seed to your configuration file.",
+            everest_config.environment.random_seed,
+        )
+        self._everest_config = everest_config
+        self._ropt_config = everest2ropt(everest_config)
+        self._sim_callback = lambda _: None
+        self._opt_callback = lambda: None
+        self._fm_errors = {}
+        self._result = None
+        self._exit_code = None
+        self._simulator_cache = (
+            SimulatorCache()
+            if (
+                everest_config.simulator is not None
+                and everest_config.simulator.enable_cache
+            )
+            else None
+        )
+        self._experiment = None
+        self._eval_server_cfg = None
+        self._batch_id = 0
+        self._status = None
+        config = self._ert_config
+        BaseRunModel.__init__(
+            self,
+            storage,
+            config.runpath_file,
+            Path(config.user_config_file),
+            config.env_vars,
+            config.env_pr_fm_step,
+            config.model_config,
+            config.queue_config,
+            config.forward_model_steps,
+            queue.SimpleQueue(),
+            config.substitutions,
+            config.ert_templates,
+            config.hooked_workflows,
+            active_realizations=[],  # Set dynamically in _run_forward_model()
+        )
+        self.support_restart = False
+        self._parameter_configuration = config.ensemble_config.parameter_configuration
+        self._parameter_configs = config.ensemble_config.parameter_configs
+        self._response_configuration = config.ensemble_config.response_configuration
 
     def run_plan(
         self, plan: PlanConfig, *, report: Callable[[Event], None] | None = None
@@ -83,13 +227,8 @@ class K2RunModel(EverestRunModel):
             if self._ert_config.queue_config.queue_system == QueueSystem.LOCAL
             else None
         )
-        self._experiment = next(
-            (
-                item
-                for item in self._storage.experiments
-                if item.name == self._everest_config.config_file
-            ),
-            None,
+        self._experiment = self._storage_index.get_experiment(
+            self._everest_config.config_file
         )
         if self._experiment is None:
             self._experiment = self._storage.create_experiment(
@@ -97,11 +236,26 @@ class K2RunModel(EverestRunModel):
                 parameters=self._ert_config.ensemble_config.parameter_configuration,
                 responses=self._ert_config.ensemble_config.response_configuration,
             )
-        plugin_manager = PluginManager()
+            self._storage_index.add_experiment(self._experiment)
+        # The metrics record the spans of the plan, to find the handler times:
+        with nullcontext() if self._metrics is None else _record_spans(self._metrics):
+            self._run_plan(plan, report)
+
+    def _run_plan(
+        self, plan: PlanConfig, report: Callable[[Event], None] | None
+    ) -> None:
+        plan_plugin = K2PlanPlugin(
+            self._everest_config,
+            self._ert_config,
+            self._storage,
+            self._batch_timeout,
+            self._surrogate,
+        )
+        plugin_manager = _TimedPluginManager() if _is_recording() else PluginManager()
         plugin_manager.add_plugin(
             "plan",
             "k2",
-            K2PlanPlugin(self._everest_config, self._storage),
+            plan_plugin,
             prioritize=True,
         )
         context = OptimizerContext(
@@ -112,83 +266,99 @@ class K2RunModel(EverestRunModel):
             },
         )
         context.add_observer(EventType.FINISHED_EVALUATION, self._store_restart_data)
+        if self._metrics is not None:
+            context.add_observer(
+                EventType.FINISHED_EVALUATION, self._metrics.handle_event
+            )
         if report:
             context.add_observer(EventType.FINISHED_EVALUATION, report)
-        Plan(plan, context).run(self._everest_config_dict)
+        try:
+            Plan(plan, context).run(self._everest_config_dict)
+        finally:
+            try:
+                self._background_tasks.close()
+            finally:
+                plan_plugin.close()
+                self._restart_journal.close()
+                self._storage_index.close()
+                if self._metrics is not None:
+                    self._metrics.close()
+                if self._evaluation_cache is not None:
+                    self._evaluation_cache.close()
+                self._runpath_cleaner.close()
+                self._latencies.report(
+                    Path(self._everest_config.output_dir) / "batch_latency.json"
+                )
 
     def _try_restart(
         self, control_values: NDArray[np.float64]
     ) -> EvaluatorResult | None:
-        path = Path(self._everest_config.output_dir) / "restart"
-        with (
-            suppress(FileNotFoundError),
-            (path / f"batch{self._batch_id}.pickle").open("rb") as file_obj,
-        ):
-            stored_result = pickle.load(file_obj)  # noqa: S301
-            if self._batch_id == stored_result["batch_id"] and np.allclose(
-                control_values, stored_result["control_values"]
+        stored_result = self._restart_journal.get(self._batch_id)
+        if stored_result is None:
+            # Fall back to restart data stored by older versions:
+            path = Path(self._everest_config.output_dir) / "restart"
+            with (
+                suppress(FileNotFoundError),
+                (path / f"batch{self._batch_id}.pickle").open("rb") as file_obj,
             ):
-                self._batch_id += 1
-                return stored_result["evaluator_result"]
+                stored_result = pickle.load(file_obj)  # noqa: S301
+        if (
+            stored_result is not None
+            and self._batch_id == stored_result["batch_id"]
+            and np.allclose(control_values, stored_result["control_values"])
+        ):
+            self._batch_id += 1
+            evaluator_result: EvaluatorResult = stored_result["evaluator_result"]
+            return evaluator_result
         return None
 
     def _run_forward_model(
         self, control_values: NDArray[np.float64], evaluator_context: EvaluatorContext
     ) -> EvaluatorResult:
+        # Wait until the results of the previous batch are stored:
+        self._background_tasks.wait()
+        start = time.perf_counter()
+
         # Reset the current run status:
         self._restart_data = {}
         self._status = None
 
+        # Get the evaluator result from a previous run, if possible:
+        with _span("restart_lookup"):
+            evaluator_result = self._try_restart(control_values)
+        restarted = evaluator_result is not None
+
         # Get cached_results:
-        cached_results = self._get_cached_results(control_values, evaluator_context)
+        with _span("cache_lookup"):
+            cached_results = self._get_cached_results(control_values, evaluator_context)
+
+        # Predict the results that need not be simulated, unless restarted:
+        predicted: dict[int, _Prediction] = {}
+        if not restarted:
+            with _span("surrogate"):
+                predicted = self._screen_batch(
+                    control_values, evaluator_context, cached_results
+                )
 
         # Create the batch to run:
         batch_data = self._init_batch_data(
-            control_values, evaluator_context, cached_results
+            control_values, evaluator_context, cached_results | predicted
         )
 
-        # Get the evaluator result:
-        evaluator_result = self._try_restart(control_values)
+        results: _SimulationResults | None = None
         if evaluator_result is None:
-            assert self._experiment is not None
-            ensemble_name = f"batch_{self._batch_id}"
-            try:
-                # Try to find an existing ensemble in storage:
-                ensemble = self._experiment.get_ensemble_by_name(ensemble_name)
-            except KeyError:
-                # Initialize a new ensemble in storage:
-                ensemble = self._experiment.create_ensemble(
-                    name=ensemble_name, ensemble_size=len(batch_data)
-                )
-                for sim_id, controls in enumerate(batch_data.values()):
-                    self._setup_sim(sim_id, controls, ensemble)
-
-            # Get the run args:
-            run_args = self._get_run_args(ensemble, evaluator_context, batch_data)
-
-            # Remove any existing runpath directories:
-            for run_arg in run_args:
-                shutil.rmtree(run_arg.runpath, ignore_errors=True)
-
-            # Evaluate the batch:
-            self._context_env.update(
-                {
-                    "_ERT_EXPERIMENT_ID": str(ensemble.experiment_id),
-                    "_ERT_ENSEMBLE_ID": str(ensemble.id),
-                    "_ERT_SIMULATION_MODE": "batch_simulation",
-                }
-            )
-            assert self._eval_server_cfg
-            self._evaluate_and_postprocess(run_args, ensemble, self._eval_server_cfg)
-
-            # If necessary, delete the run path:
-            self._delete_runpath(run_args)
-
-            # Gather the results and create the result for ropt:
-            results = self._gather_simulation_results(ensemble)
+            # Evaluate the batch, unless all results were found in the cache:
+            if batch_data and self._python_evaluator is not None:
+                with _span("evaluation"):
+                    results = self._evaluate_python(
+                        control_values, evaluator_context, batch_data
+                    )
+            elif batch_data:
+                results = self._evaluate_batch(evaluator_context, batch_data)
             evaluator_result = self._make_evaluator_result(
                 control_values, batch_data, results, cached_results
             )
+            self._add_predictions(evaluator_result, predicted)
 
             # Save restart data:
             self._restart_data = {
@@ -198,23 +368,377 @@ class K2RunModel(EverestRunModel):
             }
 
             # Increase the batch ID for the next evaluation:
+            _sample_memory(f"batch:{self._batch_id}")
             self._batch_id += 1
 
-        # Add the results from the evaluations to the cache:
-        self._add_results_to_cache(
+        # Train the surrogate on the simulated results:
+        with _span("surrogate"):
+            self._train_surrogate(control_values, evaluator_context, evaluator_result)
+
+        # Record the throughput metrics:
+        if self._metrics is not None:
+            self._metrics.add_batch(
+                _BatchMetrics(
+                    start=start,
+                    end=time.perf_counter(),
+                    evaluations=len(batch_data) + len(cached_results | predicted),
+                    cached=len(cached_results),
+                    predicted=len(predicted),
+                    simulations=0 if restarted else len(batch_data),
+                    failed=0 if results is None else results.failed,
+                    restarted=restarted,
+                )
+            )
+
+        # Add the results from the evaluations to the cache in the background:
+        self._background_tasks.submit(
+            self._store_results_in_cache,
             control_values,
             evaluator_context,
             batch_data,
-            evaluator_result.objectives,
-            evaluator_result.constraints,
+            evaluator_result,
         )
 
         return evaluator_result
 
+    def _screen_batch(
+        self,
+        control_values: NDArray[np.float64],
+        evaluator_context: EvaluatorContext,
+        cached_results: dict[int, Any],
+    ) -> dict[int, _Prediction]:
+        if not self._surrogate.enabled:
+            return {}
+        realizations = self._everest_config.model.realizations
+        evaluated = [
+            control_idx
+            for control_idx, real_idx in enumerate(evaluator_context.realizations)
+            if evaluator_context.active is None or evaluator_context.active[real_idx]
+        ]
+        return self._surrogate.screen(
+            [realizations[real_idx] for real_idx in evaluator_context.realizations],
+            control_values,
+            [
+                control_idx
+                for control_idx in evaluated
+                if control_idx not in cached_results
+            ],
+            evaluated,
+            evaluator_context.perturbations,
+        )
+
+    def _add_predictions(
+        self, evaluator_result: EvaluatorResult, predicted: dict[int, _Prediction]
+    ) -> None:
+        # Predictions are rows of objectives, followed by constraints:
+        values = evaluator_result.objectives
+        if evaluator_result.constraints is not None:
+            values = np.hstack((values, evaluator_result.constraints))
+        for control_idx, prediction in predicted.items():
+            values[control_idx, :] = prediction.value
+            if prediction.reference is not None:
+                values[control_idx, :] += values[prediction.reference, :]
+        num_objectives = evaluator_result.objectives.shape[1]
+        evaluator_result.objectives[...] = values[:, :num_objectives]
+        if evaluator_result.constraints is not None:
+            evaluator_result.constraints[...] = values[:, num_objectives:]
+
+    def _train_surrogate(
+        self,
+        control_values: NDArray[np.float64],
+        evaluator_context: EvaluatorContext,
+        evaluator_result: EvaluatorResult,
+    ) -> None:
+        # Only simulated results have an evaluation ID:
+        if not self._surrogate.enabled or evaluator_result.evaluation_ids is None:
+            return
+        simulated = np.flatnonzero(evaluator_result.evaluation_ids >= 0)
+        if simulated.size == 0:
+            return
+        values = evaluator_result.objectives[simulated, :]
+        if evaluator_result.constraints is not None:
+            values = np.hstack((values, evaluator_result.constraints[simulated, :]))
+        realizations = self._everest_config.model.realizations
+        self._surrogate.add(
+            [
+                realizations[evaluator_context.realizations[control_idx]]
+                for control_idx in simulated
+            ],
+            control_values[simulated, :],
+            values,
+        )
+
+    def _store_results_in_cache(
+        self,
+        control_values: NDArray[np.float64],
+        evaluator_context: EvaluatorContext,
+        batch_data: dict[int, Any],
+        evaluator_result: EvaluatorResult,
+    ) -> None:
+        with _span("cache_write"):
+            self._add_results_to_cache(
+                control_values,
+                evaluator_context,
+                batch_data,
+                evaluator_result.objectives,
+                evaluator_result.constraints,
+            )
+            if self._evaluation_cache is not None:
+                self._evaluation_cache.flush()
+                self._evaluation_cache.release()
+
+    def _get_cached_results(
+        self, control_values: NDArray[np.float64], evaluator_context: EvaluatorContext
+    ) -> dict[int, Any]:
+        cached_results = super()._get_cached_results(control_values, evaluator_context)
+        if self._evaluation_cache is None or not self._evaluation_cache.shared:
+            return cached_results
+
+        # Claim the missing results, or wait for other processes that claimed
+        # them to finish, and try again:
+        realizations = self._everest_config.model.realizations
+        while not self._evaluation_cache.claim(
+            (realizations[real_idx], control_values[control_idx, :])
+            for control_idx, real_idx in enumerate(evaluator_context.realizations)
+            if control_idx not in cached_results
+            and (evaluator_context.active is None or evaluator_context.active[real_idx])
+        ):
+            time.sleep(self._evaluation_cache.poll_interval)
+            cached_results = super()._get_cached_results(
+                control_values, evaluator_context
+            )
+        return cached_results
+
+    def _init_batch_data(
+        self,
+        control_values: NDArray[np.float64],
+        evaluator_context: EvaluatorContext,
+        cached_results: dict[int, Any],
+    ) -> dict[int, Any]:
+        # The controls are stored and exported in bulk, only their values are
+        # needed, rather than nested dicts:
+        return {
+            control_idx: control_values[control_idx, :]
+            for control_idx in range(control_values.shape[0])
+            if control_idx not in cached_results
+            and (
+                evaluator_context.active is None
+                or evaluator_context.active[evaluator_context.realizations[control_idx]]
+            )
+        }
+
+    def _evaluate_batch(
+        self, evaluator_context: EvaluatorContext, batch_data: dict[int, Any]
+    ) -> _SimulationResults:
+        assert self._experiment is not None
+        self._batch_controls = np.vstack(list(batch_data.values()))
+        self._batch_geo_ids = [
+            self._everest_config.model.realizations[
+                evaluator_context.realizations[control_idx]
+            ]
+            for control_idx in batch_data
+        ]
+        # Try to find an existing ensemble in storage:
+        ensemble = self._storage_index.get_ensemble(
+            self._experiment, f"batch_{self._batch_id}"
+        )
+        if ensemble is None:
+            # Initialize a new ensemble in storage:
+            with _span("ensemble_creation"):
+                ensemble = self._experiment.create_ensemble(
+                    name=f"batch_{self._batch_id}", ensemble_size=len(batch_data)
+                )
+            self._storage_index.add_ensemble(ensemble)
+            with _span("setup_sim"):
+                _save_controls(self._control_groups, self._batch_controls, ensemble)
+
+        # Get the run args:
+        run_args = self._get_run_args(ensemble, evaluator_context, batch_data)
+
+        # Remove any existing runpath directories in the background:
+        with _span("runpath_cleanup"):
+            self._runpath_cleaner.remove(run_arg.runpath for run_arg in run_args)
+
+        # Evaluate the batch:
+        self._context_env.update(
+            {
+                "_ERT_EXPERIMENT_ID": str(ensemble.experiment_id),
+                "_ERT_ENSEMBLE_ID": str(ensemble.id),
+                "_ERT_SIMULATION_MODE": "batch_simulation",
+            }
+        )
+        self._queue_config, self.minimum_required_realizations = (
+            self._batch_timeout.apply(self._ert_config.queue_config, len(run_args))
+        )
+        assert self._eval_server_cfg
+        start = time.perf_counter()
+        with _span("evaluation"):
+            self._evaluate_and_postprocess(run_args, ensemble, self._eval_server_cfg)
+        self._batch_controls = None
+        latency = self._latencies.record(
+            self._batch_id, time.perf_counter() - start, self.get_current_snapshot()
+        )
+        if self._metrics is not None:
+            self._metrics.add_latency(latency)
+
+        # If necessary, delete the run path:
+        self._delete_runpath(run_args)
+
+        # Gather the results:
+        with _span("gather"):
+            return self._gather_simulation_results(ensemble)
+
+    def _evaluate_python(
+        self,
+        control_values: NDArray[np.float64],
+        evaluator_context: EvaluatorContext,
+        batch_data: dict[int, Any],
+    ) -> _SimulationResults:
+        assert self._python_evaluator is not None
+        control_indices = list(batch_data.keys())
+        realizations = np.fromiter(
+            (
+                self._everest_config.model.realizations[
+                    evaluator_context.realizations[control_idx]
+                ]
+                for control_idx in control_indices
+            ),
+            dtype=np.intc,
+        )
+        output = self._python_evaluator(
+            control_values[control_indices, :], realizations
+        )
+        objectives, constraints = (
+            output if isinstance(output, tuple) else (output, None)
+        )
+
+        # Convert to the same form as the results gathered from ERT:
+        functions: list[tuple[list[str], NDArray[np.float64]]] = [
+            (
+                self._everest_config.objective_names,
+                np.asarray(objectives, dtype=np.float64).reshape(
+                    len(control_indices), -1
+                ),
+            )
+        ]
+        if self._everest_config.constraint_names:
+            if constraints is None:
+                msg = "The Python evaluator did not return constraint values"
+                raise RuntimeError(msg)
+            functions.append(
+                (
+                    self._everest_config.constraint_names,
+                    np.asarray(constraints, dtype=np.float64).reshape(
+                        len(control_indices), -1
+                    ),
+                )
+            )
+        for names, values in functions:
+            if values.shape[1] != len(names):
+                msg = f"The Python evaluator returned {values.shape[1]} values, expected {len(names)}"
+                raise RuntimeError(msg)
+        return _SimulationResults(
+            columns={
+                name: idx
+                for idx, name in enumerate(
+                    name for names, _ in functions for name in names
+                )
+            },
+            values=np.hstack([values for _, values in functions]),
+        )
+
+    def _gather_simulation_results(  # type: ignore[override]
+        self, ensemble: Ensemble
+    ) -> _SimulationResults:
+        return _load_results(
+            ensemble,
+            self._everest_config.result_names,
+            self._everest_config.function_aliases,
+            self.active_realizations,
+        )
+
+    @staticmethod
+    def _get_simulation_results(  # type: ignore[override]
+        results: _SimulationResults | None,
+        names: list[str],
+        controls: NDArray[np.float64],
+        batch_data: dict[int, Any],
+    ) -> NDArray[np.float64]:
+        values = np.zeros((controls.shape[0], len(names)), dtype=np.float64)
+        if results is not None:
+            values[list(batch_data), :] = results.get(names)
+        return values
+
+    def _evaluate_and_postprocess(
+        self,
+        run_args: list[RunArg],
+        ensemble: Ensemble,
+        evaluator_server_config: EvaluatorServerConfig,
+    ) -> int:
+        # ERT exports the controls by reading them back from storage, one value
+        # at a time. Export them from memory, and hide them from ERT:
+        assert self._batch_controls is not None
+        with _span("export_controls"):
+            _export_controls(
+                self._control_groups, self._batch_controls, run_args, ensemble.iteration
+            )
+        if self._input_store is not None:
+            with _span("install_inputs"):
+                self._input_store.install(
+                    (run_arg.runpath, self._batch_geo_ids[run_arg.iens])
+                    for run_arg in run_args
+                    if run_arg.active
+                )
+        with _span("create_run_path"):
+            create_run_path(
+                run_args=run_args,
+                ensemble=_EnsembleView(  # type: ignore[arg-type]
+                    ensemble, {group.name for group in self._control_groups}
+                ),
+                user_config_file=str(self._user_config_file),
+                env_vars=self._env_vars,
+                env_pr_fm_step=self._env_pr_fm_step,
+                forward_model_steps=self._forward_model_steps,
+                substitutions=self._substitutions,
+                templates=self._templates,
+                model_config=self._model_config,
+                runpaths=self.run_paths,
+                context_env=self._context_env,
+            )
+
+        self.run_workflows(HookRuntime.PRE_SIMULATION, self._storage, ensemble)
+        successful_realizations = self.run_ensemble_evaluator(
+            run_args, ensemble, evaluator_server_config
+        )
+        for iens in {run_arg.iens for run_arg in run_args if run_arg.active} - set(
+            successful_realizations
+        ):
+            self.active_realizations[iens] = False
+        self.validate_successful_realizations_count()
+        self.run_workflows(HookRuntime.POST_SIMULATION, self._storage, ensemble)
+        return len(successful_realizations)
+
+    def _delete_runpath(self, run_args: list[RunArg]) -> None:
+        if (
+            self._everest_config.simulator is not None
+            and self._everest_config.simulator.delete_run_path
+        ):
+            with _span("runpath_cleanup"):
+                self._runpath_cleaner.remove(
+                    run_args[int(iens)].runpath
+                    for iens, real in self.get_current_snapshot().reals.items()
+                    if real["status"] == "Finished"
+                )
+
+    def validate_successful_realizations_count(self) -> None:
+        """Skip the check, failed realizations are handled by the optimizer."""
+
     def _store_restart_data(self, event: Event) -> None:
-        if "exit_code" not in event.data and self._restart_data:
-            path = Path(self._everest_config.output_dir) / "restart"
-            batch = self._restart_data["batch_id"]
-            path.mkdir(exist_ok=True)
-            with (path / f"batch{batch}.pickle").open("wb") as file_obj:
-                pickle.dump(self._restart_data, file_obj)
+        if event.data.get("exit_code") is None and self._restart_data:
+            self._background_tasks.submit(
+                self._restart_journal.append,
+                self._restart_data["batch_id"],
+                self._restart_data,
+            )
+            # The journal task holds the only remaining reference:
+            self._restart_data = {}
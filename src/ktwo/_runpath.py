@@ -0,0 +1,64 @@
+"""This module implements the background removal of run paths."""
+
+from __future__ import annotations
+
+import logging
+import shutil
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import suppress
+from pathlib import Path
+from typing import Iterable
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _RunpathCleaner:
+    """Remove run path directories in the background.
+
+    Directories are first renamed into a trash directory, which is fast and
+    frees the original path immediately, and are then deleted by a pool of
+    background threads. If a directory cannot be renamed, e.g. because the
+    trash directory is on a different file system, it is removed directly.
+    """
+
+    def __init__(self, trash_dir: Path, *, max_workers: int | None = None) -> None:
+        self._trash_dir = trash_dir
+        self._executor: ThreadPoolExecutor | None = None
+        self._max_workers = max_workers
+        self._futures: set[Future[None]] = set()
+
+    def remove(self, paths: Iterable[str | Path]) -> None:
+        """Schedule the removal of a set of directories."""
+        for path in paths:
+            if not Path(path).is_dir():
+                continue
+            try:
+                self._trash_dir.mkdir(parents=True, exist_ok=True)
+                trash_path = self._trash_dir / uuid.uuid4().hex
+                Path(path).rename(trash_path)
+            except OSError:
+                shutil.rmtree(path, onerror=_log_error)
+                continue
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="k2-runpath"
+                )
+            future = self._executor.submit(
+                shutil.rmtree, trash_path, onerror=_log_error
+            )
+            self._futures.add(future)
+            future.add_done_callback(self._futures.discard)
+
+    def close(self) -> None:
+        """Wait for all pending removals to finish."""
+        wait(list(self._futures))
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        with suppress(OSError):
+            self._trash_dir.rmdir()
+
+
+def _log_error(_: object, path: str, exc_info: object) -> None:
+    _LOGGER.debug("Failed to remove %s: %s", path, exc_info)
@@ -0,0 +1,91 @@
+"""This module implements the k2 save arrays step."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+from ropt.plugins.plan.base import PlanStep
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+    from ropt.config.plan import PlanStepConfig
+    from ropt.plan import Plan
+
+
+class K2SaveArraysStep(PlanStep):
+    """The k2 save arrays step.
+
+    This step saves a dictionary of arrays, such as the output of the
+    `results2arrays` function, to a NumPy `.npz` file. Nested dictionaries are
+    flattened, joining their keys with a `/`. The file can be read with
+    `numpy.load`, without unpickling any data.
+    """
+
+    class K2SaveArraysStepWith(BaseModel):
+        """Parameters used by the save arrays step.
+
+        If the path includes directories that do not yet exist, they will be
+        created.
+
+        Attributes:
+            data:       The arrays to save.
+            path:       The file path where the output will be stored.
+            compressed: Compress the stored arrays.
+        """
+
+        data: Any
+        path: str | Path
+        compressed: bool = False
+
+        model_config = ConfigDict(
+            extra="forbid",
+            validate_default=True,
+            arbitrary_types_allowed=True,
+            frozen=True,
+        )
+
+    def __init__(self, config: PlanStepConfig, plan: Plan) -> None:
+        """Initialize a save arrays step.
+
+        Args:
+            config: The configuration of the step.
+            plan:   The plan that runs this step.
+        """
+        super().__init__(config, plan)
+        self._with = self.K2SaveArraysStepWith.model_validate(config.with_)
+
+    def run(self) -> None:
+        """Run the save arrays step."""
+        path = Path(self.plan.eval(self._with.path))
+        if path.parent.exists() and not path.parent.is_dir():
+            msg = f"Not a directory to store results: {path.parent}"
+            raise RuntimeError(msg)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = self.plan.eval(self._with.data)
+        if not isinstance(data, dict):
+            msg = "The data to save must be a dictionary of arrays"
+            raise TypeError(msg)
+        arrays = _flatten(data)
+        # Write via a file object, numpy would otherwise append a suffix:
+        with path.open("wb") as file_obj:
+            if self._with.compressed:
+                np.savez_compressed(file_obj, **arrays)
+            else:
+                np.savez(file_obj, **arrays)
+
+
+def _flatten(data: dict[Any, Any], prefix: str = "") -> dict[str, NDArray[Any]]:
+    arrays: dict[str, NDArray[Any]] = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            arrays.update(_flatten(value, f"{prefix}{key}/"))
+        else:
+            array = np.asarray(value)
+            if array.dtype == np.object_:
+                msg = f"Cannot save {prefix}{key} as an array"
+                raise TypeError(msg)
+            arrays[f"{prefix}{key}"] = array
+    return arrays
@@ -0,0 +1,148 @@
+"""This module implements fast access to experiments and ensembles in storage."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TextIO
+from uuid import UUID
+
+from ert.storage import ErtStorageException
+from ert.storage.local_storage import LocalStorage
+from ert.storage.mode import Mode
+
+if TYPE_CHECKING:
+    import os
+
+    from ert.storage import Ensemble, Experiment, Storage
+    from ert.storage.mode import ModeLiteral
+
+
+class _LazyStorage(LocalStorage):
+    """A local storage that determines the state of ensembles when needed.
+
+    When opening a storage, ERT determines the state of all realizations of all
+    ensembles, which dominates the startup time of large storages. The state of
+    an ensemble is cached on first use, hence it is sufficient to skip this.
+    """
+
+    def refresh(self) -> None:
+        """Reload the index, experiments, and ensembles from the storage."""
+        self._index = self._load_index()
+        self._ensembles = self._load_ensembles()
+        self._experiments = self._load_experiments()
+
+
+def _open_lazy_storage(
+    path: str | os.PathLike[str], mode: ModeLiteral | Mode = "r"
+) -> Storage:
+    """Open a storage as a `_LazyStorage` object, as `ert.storage.open_storage`."""
+    try:
+        return _LazyStorage(Path(path), Mode(mode))
+    except Exception as err:
+        msg = f"Failed to open storage: {path} with error: {err}"
+        raise ErtStorageException(msg) from err
+
+
+class _StorageIndex:
+    """A persistent index of the experiments and ensembles used by k2.
+
+    The index maps experiment names to IDs, and the names of the ensembles of
+    an experiment to IDs. It is stored in a file with a JSON record per line,
+    which is appended to when experiments and ensembles are added. Entries that
+    are not found in the storage are ignored, in which case a search by name
+    is done, and the index is updated.
+    """
+
+    def __init__(self, storage: Storage, path: Path) -> None:
+        self._storage = storage
+        self._path = path
+        self._experiments: dict[str, UUID] = {}
+        self._ensembles: dict[tuple[UUID, str], UUID] = {}
+        self._file: TextIO | None = None
+        self._needs_newline = False
+        if path.exists():
+            with path.open(encoding="utf-8") as file_obj:
+                for line in file_obj:
+                    self._load_record(line)
+                    self._needs_newline = not line.endswith("\n")
+
+    def get_experiment(self, name: str) -> Experiment | None:
+        """Find an experiment by name."""
+        experiment_id = self._experiments.get(name)
+        if experiment_id is not None:
+            try:
+                return self._storage.get_experiment(experiment_id)
+            except KeyError:
+                pass
+        experiment = next(
+            (item for item in self._storage.experiments if item.name == name), None
+        )
+        if experiment is not None:
+            self.add_experiment(experiment)
+        return experiment
+
+    def get_ensemble(self, experiment: Experiment, name: str) -> Ensemble | None:
+        """Find an ensemble of an experiment by name."""
+        ensemble_id = self._ensembles.get((experiment.id, name))
+        if ensemble_id is not None:
+            try:
+                ensemble = self._storage.get_ensemble(ensemble_id)
+            except KeyError:
+                pass
+            else:
+                if ensemble.experiment_id == experiment.id:
+                    return ensemble
+        try:
+            ensemble = experiment.get_ensemble_by_name(name)
+        except KeyError:
+            return None
+        self.add_ensemble(ensemble)
+        return ensemble
+
+    def add_experiment(self, experiment: Experiment) -> None:
+        """Add an experiment to the index."""
+        assert experiment.name is not None
+        self._experiments[experiment.name] = experiment.id
+        self._append({"experiment": experiment.name, "id": str(experiment.id)})
+
+    def add_ensemble(self, ensemble: Ensemble) -> None:
+        """Add an ensemble to the index."""
+        self._ensembles[ensemble.experiment_id, ensemble.name] = ensemble.id
+        self._append(
+            {
+                "experiment_id": str(ensemble.experiment_id),
+                "ensemble": ensemble.name,
+                "id": str(ensemble.id),
+            }
+        )
+
+    def close(self) -> None:
+        """Close the index file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _load_record(self, line: str) -> None:
+        # Ignore invalid records, such as a record truncated by a crash:
+        try:
+            record = json.loads(line)
+            if "experiment" in record:
+                self._experiments[record["experiment"]] = UUID(record["id"])
+            else:
+                self._ensembles[UUID(record["experiment_id"]), record["ensemble"]] = (
+                    UUID(record["id"])
+                )
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    def _append(self, record: dict[str, Any]) -> None:
+        if self._file is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self._path.open("a", encoding="utf-8")
+        # Start on a new line, in case the last record was truncated:
+        if self._needs_newline:
+            self._file.write("\n")
+            self._needs_newline = False
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
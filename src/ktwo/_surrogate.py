@@ -0,0 +1,387 @@
+"""This module implements the k2 surrogate screening step."""
+
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Annotated, Final, Literal, Sequence
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, PositiveFloat, PositiveInt
+from ropt.plugins.plan.base import PlanStep
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+    from ropt.config.plan import PlanStepConfig
+    from ropt.plan import Plan
+
+_LOGGER = logging.getLogger(__name__)
+
+# Added to the diagonal of the kernel matrix, for numerical stability:
+_NUGGET: Final = 1e-6
+
+# Length scales that are tried, relative to the median training point distance:
+_LENGTH_SCALE_FACTORS: Final = np.logspace(-1, 1, 9)
+
+
+@dataclass(frozen=True, slots=True)
+class _Prediction:
+    """A predicted result.
+
+    Predictions are made relative to a reference: a known result of the same
+    realization, or a result that is simulated in the same batch.
+
+    Attributes:
+        reference: The index of the reference evaluation in the batch, if any.
+        value:     The predicted value, or its difference with the reference.
+    """
+
+    reference: int | None
+    value: NDArray[np.float64]
+
+
+@dataclass(slots=True)
+class _History:
+    """The most recent training data of a realization, in a ring buffer.
+
+    Attributes:
+        inputs:  The control values, one row per result.
+        outputs: The simulated values, one row per result.
+        size:    The number of stored results.
+        next:    The row where the next result is stored.
+    """
+
+    inputs: NDArray[np.float64]
+    outputs: NDArray[np.float64]
+    size: int = 0
+    next: int = 0
+
+    def add(self, inputs: NDArray[np.float64], outputs: NDArray[np.float64]) -> None:
+        """Add results, replacing the oldest results if the buffer is full."""
+        capacity = self.inputs.shape[0]
+        inputs, outputs = inputs[-capacity:, :], outputs[-capacity:, :]
+        rows = (self.next + np.arange(inputs.shape[0])) % capacity
+        self.inputs[rows, :] = inputs
+        self.outputs[rows, :] = outputs
+        self.next = int(rows[-1] + 1) % capacity
+        self.size = min(self.size + inputs.shape[0], capacity)
+
+    def get(self) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Return views of the stored inputs and outputs."""
+        return self.inputs[: self.size, :], self.outputs[: self.size, :]
+
+
+@dataclass(slots=True)
+class _Surrogate:
+    """Screen evaluations using local Gaussian process surrogates.
+
+    The surrogates are fitted per realization, on the results of earlier
+    simulations. They predict the difference between an evaluation and the
+    nearest evaluation with a known result. Evaluations for which the predicted
+    difference is sufficiently certain are not simulated, the predictions are
+    returned instead.
+
+    Attributes:
+        max_uncertainty: Maximum standard deviation of a predicted difference,
+                         relative to the difference, of a skipped evaluation.
+        evaluations:     The evaluations that may be skipped.
+        min_samples:     Minimum number of training points of a surrogate.
+        neighbors:       Number of nearest training points used in a prediction.
+        max_skipped:     Maximum fraction of a batch that may be skipped.
+        max_samples:     Maximum number of results kept per realization.
+    """
+
+    max_uncertainty: float | None = None
+    evaluations: Literal["perturbations", "all"] = "perturbations"
+    min_samples: int = 10
+    neighbors: int = 50
+    max_skipped: float = 0.5
+    max_samples: int = 1000
+    _history: dict[int, _History] = field(default_factory=dict, repr=False)
+
+    @property
+    def enabled(self) -> bool:
+        """Return `True` if screening is enabled."""
+        return self.max_uncertainty is not None
+
+    def add(
+        self,
+        keys: Sequence[int],
+        controls: NDArray[np.float64],
+        values: NDArray[np.float64],
+    ) -> None:
+        """Add simulation results to the training data.
+
+        Results with missing values, such as those of failed realizations, are
+        not added. Only the most recent `max_samples` results of a realization
+        are kept.
+
+        Args:
+            keys:     The realization of each simulation.
+            controls: The control values, one row per simulation.
+            values:   The simulated values, one row per simulation.
+        """
+        valid = np.all(np.isfinite(values), axis=1)
+        keys_array = np.asarray(keys)
+        for key in np.unique(keys_array[valid]):
+            mask = valid & (keys_array == key)
+            history = self._history.get(int(key))
+            if (
+                history is None
+                or history.inputs.shape != (self.max_samples, controls.shape[1])
+                or history.outputs.shape[1] != values.shape[1]
+            ):
+                history = self._history[int(key)] = _History(
+                    np.empty((self.max_samples, controls.shape[1])),
+                    np.empty((self.max_samples, values.shape[1])),
+                )
+            history.add(controls[mask, :], values[mask, :])
+
+    def screen(
+        self,
+        keys: Sequence[int],
+        controls: NDArray[np.float64],
+        candidates: Sequence[int],
+        evaluated: Sequence[int],
+        perturbations: NDArray[np.intc] | None,
+    ) -> dict[int, _Prediction]:
+        """Predict the results of the evaluations that need not be simulated.
+
+        Args:
+            keys:          The realization of each evaluation.
+            controls:      The control values, one row per evaluation.
+            candidates:    The indices of the evaluations that may be skipped.
+            evaluated:     The indices of all evaluations that produce a result.
+            perturbations: The perturbation index of each evaluation, if any.
+
+        Returns:
+            The predictions, by evaluation index.
+        """
+        if not self.enabled or not candidates:
+            return {}
+        screened = {
+            idx
+            for idx in candidates
+            if self.evaluations == "all"
+            or (perturbations is not None and perturbations[idx] >= 0)
+        }
+        references = [idx for idx in evaluated if idx not in screened]
+        predictions: dict[int, tuple[_Prediction, float]] = {}
+        for idx in sorted(screened):
+            prediction = self._predict(
+                keys[idx],
+                controls[idx, :],
+                controls,
+                [ref for ref in references if keys[ref] == keys[idx]],
+            )
+            if prediction is not None and prediction[1] <= self.max_uncertainty:
+                predictions[idx] = prediction
+
+        # Skip the most certain predictions, up to the maximum fraction:
+        max_count = math.floor(self.max_skipped * len(candidates))
+        skipped = sorted(predictions, key=lambda idx: predictions[idx][1])[:max_count]
+        if skipped:
+            _LOGGER.info(
+                "Skipping %d of %d simulations using surrogate predictions",
+                len(skipped),
+                len(candidates),
+            )
+        return {idx: predictions[idx][0] for idx in sorted(skipped)}
+
+    def _predict(
+        self,
+        key: int,
+        point: NDArray[np.float64],
+        controls: NDArray[np.float64],
+        references: list[int],
+    ) -> tuple[_Prediction, float] | None:
+        if key not in self._history:
+            return None
+        inputs, outputs = self._history[key].get()
+        if inputs.shape[0] < self.min_samples or inputs.shape[1] != point.size:
+            return None
+
+        # The nearest reference, from the training data or from the batch:
+        distances = np.sum((inputs - point) ** 2, axis=1)
+        nearest = int(np.argmin(distances))
+        reference: int | None = None
+        reference_point, reference_value = inputs[nearest, :], outputs[nearest, :]
+        if references:
+            batch_distances = np.sum((controls[references, :] - point) ** 2, axis=1)
+            batch_nearest = int(np.argmin(batch_distances))
+            if batch_distances[batch_nearest] <= distances[nearest]:
+                reference = references[batch_nearest]
+                reference_point = controls[reference, :]
+
+        if inputs.shape[0] > self.neighbors:
+            indices = np.argpartition(distances, self.neighbors)[: self.neighbors]
+            inputs, outputs = inputs[indices, :], outputs[indices, :]
+        process = _GaussianProcess.fit(inputs, outputs)
+        if process is None:
+            return None
+        difference, std = process.difference(point, reference_point)
+
+        # The relative uncertainty of the least certain output:
+        if np.any(std > 0.0) and not np.all(np.abs(difference)[std > 0.0] > 0.0):
+            return None
+        uncertainty = float(np.max(std / np.where(std > 0.0, np.abs(difference), 1.0)))
+        return (
+            _Prediction(
+                reference=reference,
+                value=difference
+                if reference is not None
+                else reference_value + difference,
+            ),
+            uncertainty,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class _GaussianProcess:
+    """A Gaussian process with a squared exponential kernel.
+
+    The outputs are normalized and share the kernel, but each output has its
+    own signal variance.
+    """
+
+    inputs: NDArray[np.float64]
+    scale: float
+    kernel: NDArray[np.float64]
+    weights: NDArray[np.float64]
+    variance: NDArray[np.float64]
+    std: NDArray[np.float64]
+
+    @classmethod
+    def fit(
+        cls, inputs: NDArray[np.float64], outputs: NDArray[np.float64]
+    ) -> _GaussianProcess | None:
+        """Fit a process, selecting the length scale by maximum likelihood.
+
+        Returns:
+            The fitted process, or `None` if it cannot be fitted.
+        """
+        squared = np.sum(
+            (inputs[:, np.newaxis, :] - inputs[np.newaxis, :, :]) ** 2, axis=-1
+        )
+        nonzero = squared[squared > 0.0]
+        if nonzero.size == 0:
+            return None
+        std = np.std(outputs, axis=0)
+        varying = std > 0.0
+        std[~varying] = 1.0
+        normalized = (outputs - np.mean(outputs, axis=0)) / std
+
+        best: tuple[float, _GaussianProcess] | None = None
+        median = float(np.median(nonzero))
+        for factor in _LENGTH_SCALE_FACTORS:
+            scale = 2.0 * factor**2 * median
+            kernel = np.exp(-squared / scale) + _NUGGET * np.eye(inputs.shape[0])
+            try:
+                cholesky = np.linalg.cholesky(kernel)
+            except np.linalg.LinAlgError:
+                continue
+            weights = np.linalg.solve(kernel, normalized)
+            # The signal variance of each output, and the profile likelihood:
+            variance = np.sum(normalized * weights, axis=0) / inputs.shape[0]
+            log_likelihood = -0.5 * inputs.shape[0] * np.sum(
+                np.log(variance[varying])
+            ) - np.count_nonzero(varying) * np.sum(np.log(np.diag(cholesky)))
+            if best is None or log_likelihood > best[0]:
+                best = (
+                    log_likelihood,
+                    cls(inputs, scale, kernel, weights, variance, std),
+                )
+        return None if best is None else best[1]
+
+    def difference(
+        self, point: NDArray[np.float64], reference: NDArray[np.float64]
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Predict the difference between the outputs at a point and a reference.
+
+        Returns:
+            The mean and the standard deviation of the predicted difference.
+        """
+        # Avoid cancellation errors, since the points may be very close:
+        offset = point - reference
+        reference_kernel = np.exp(
+            -np.sum((self.inputs - reference) ** 2, axis=1) / self.scale
+        )
+        kernel_difference = reference_kernel * np.expm1(
+            -(2.0 * (reference - self.inputs) + offset) @ offset / self.scale
+        )
+        solved = np.linalg.solve(self.kernel, kernel_difference)
+        prior = -2.0 * np.expm1(-float(offset @ offset) / self.scale)
+        posterior = max(prior - float(kernel_difference @ solved), 0.0)
+        return (
+            self.std * (kernel_difference @ self.weights),
+            self.std * np.sqrt(self.variance * posterior),
+        )
+
+
+class K2SurrogateStep(PlanStep):
+    """The k2 surrogate screening step.
+
+    This step configures the screening of the evaluations that follow it. Each
+    realization has a Gaussian process surrogate, fitted to the nearest results
+    of earlier simulations of that realization. The surrogate predicts the
+    difference between an evaluation and the nearest evaluation with a known
+    result, such as the unperturbed evaluation in a gradient calculation.
+    Evaluations with a sufficiently certain prediction are not simulated, and
+    the predictions are passed to the optimizer instead.
+    """
+
+    class K2SurrogateStepWith(BaseModel):
+        """Parameters used by the surrogate step.
+
+        If `max_uncertainty` is not given, screening is disabled. By default,
+        only perturbations used for gradient estimation are screened.
+
+        The uncertainty is the standard deviation of a predicted difference,
+        relative to the predicted difference.
+
+        Attributes:
+            max_uncertainty: Maximum uncertainty of a prediction.
+            evaluations:     Screen only perturbations, or all evaluations.
+            min_samples:     Minimum number of results needed for predictions.
+            neighbors:       Number of nearest results used in a prediction.
+            max_skipped:     Maximum fraction of a batch that is not simulated.
+            max_samples:     Maximum number of results kept per realization.
+        """
+
+        max_uncertainty: PositiveFloat | None = None
+        evaluations: Literal["perturbations", "all"] = "perturbations"
+        min_samples: PositiveInt = 10
+        neighbors: PositiveInt = 50
+        max_skipped: Annotated[float, Field(gt=0.0, le=1.0)] = 0.5
+        max_samples: PositiveInt = 1000
+
+        model_config = ConfigDict(
+            extra="forbid",
+            validate_default=True,
+            arbitrary_types_allowed=True,
+            frozen=True,
+        )
+
+    def __init__(
+        self, config: PlanStepConfig, plan: Plan, surrogate: _Surrogate
+    ) -> None:
+        """Initialize a surrogate step.
+
+        Args:
+            config:    The configuration of the step.
+            plan:      The plan that runs this step.
+            surrogate: The surrogate settings to modify.
+        """
+        super().__init__(config, plan)
+        self._with = self.K2SurrogateStepWith.model_validate(config.with_ or {})
+        self._surrogate = surrogate
+
+    def run(self) -> None:
+        """Run the surrogate step."""
+        self._surrogate.max_uncertainty = self._with.max_uncertainty
+        self._surrogate.evaluations = self._with.evaluations
+        self._surrogate.min_samples = self._with.min_samples
+        self._surrogate.neighbors = self._with.neighbors
+        self._surrogate.max_skipped = self._with.max_skipped
+        self._surrogate.max_samples = self._with.max_samples
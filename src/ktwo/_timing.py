@@ -0,0 +1,279 @@
+"""This module implements timing instrumentation for k2."""
+
+from __future__ import annotations
+
+import json
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Final, Iterator
+
+from ropt.plugins import PluginManager
+from ropt.plugins.plan.base import PlanPlugin, PlanStep, ResultHandler
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from ropt.config.plan import PlanStepConfig, ResultHandlerConfig
+    from ropt.plan import Event, Plan
+    from ropt.plugins import PluginType
+
+
+@dataclass(frozen=True, slots=True)
+class _Span:
+    """A timed phase.
+
+    Attributes:
+        name:     The name of the phase.
+        start:    The start time, as returned by `time.perf_counter`.
+        duration: The duration in seconds.
+        thread:   The identifier of the thread that ran the phase.
+    """
+
+    name: str
+    start: float
+    duration: float
+    thread: int
+
+
+@dataclass(frozen=True, slots=True)
+class _MemorySample:
+    """A sample of the memory use of the process.
+
+    Attributes:
+        name: The name of the sample.
+        time: The time of the sample, as returned by `time.perf_counter`.
+        rss:  The resident set size in bytes.
+        peak: The peak resident set size in bytes.
+    """
+
+    name: str
+    time: float
+    rss: int
+    peak: int
+
+
+class _SpanRecorder:
+    """Record timed phases and memory samples, from any thread."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._spans: list[_Span] = []
+        self._samples: list[_MemorySample] = []
+        self._thread_names: dict[int, str] = {}
+        self.origin = time.perf_counter()
+
+    def add(self, span: _Span) -> None:
+        """Add a span."""
+        with self._lock:
+            self._spans.append(span)
+            if span.thread not in self._thread_names:
+                self._thread_names[span.thread] = threading.current_thread().name
+
+    def add_sample(self, sample: _MemorySample) -> None:
+        """Add a memory sample."""
+        with self._lock:
+            self._samples.append(sample)
+
+    @property
+    def spans(self) -> list[_Span]:
+        """Return a copy of the recorded spans."""
+        with self._lock:
+            return list(self._spans)
+
+    @property
+    def samples(self) -> list[_MemorySample]:
+        """Return a copy of the recorded memory samples."""
+        with self._lock:
+            return list(self._samples)
+
+    def memory(self) -> list[dict[str, Any]]:
+        """Return the memory samples, with sizes in MiB."""
+        return [
+            {
+                "name": sample.name,
+                "time": sample.time - self.origin,
+                "rss": sample.rss / _MIB,
+                "peak": sample.peak / _MIB,
+            }
+            for sample in self.samples
+        ]
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Summarize the recorded spans by name."""
+        summary: dict[str, dict[str, Any]] = {}
+        for span in self.spans:
+            item = summary.setdefault(span.name, {"count": 0, "total": 0.0, "max": 0.0})
+            item["count"] += 1
+            item["total"] += span.duration
+            item["max"] = max(item["max"], span.duration)
+        for item in summary.values():
+            item["mean"] = item["total"] / item["count"]
+        return summary
+
+    def write_trace(self, path: Path) -> None:
+        """Write the spans in the Chrome trace event format.
+
+        The resulting file can be loaded in `chrome://tracing` or Perfetto.
+        """
+        pid = os.getpid()
+        with self._lock:
+            thread_names = dict(self._thread_names)
+        events: list[dict[str, Any]] = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in thread_names.items()
+        ]
+        events.extend(
+            {
+                "name": span.name,
+                "cat": span.name.partition(":")[0],
+                "ph": "X",
+                "ts": (span.start - self.origin) * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": pid,
+                "tid": span.thread,
+            }
+            for span in self.spans
+        )
+        events.extend(
+            {
+                "name": "memory",
+                "ph": "C",
+                "ts": (sample.time - self.origin) * 1e6,
+                "pid": pid,
+                "args": {"rss": sample.rss / _MIB},
+            }
+            for sample in self.samples
+        )
+        with path.open("w", encoding="utf-8") as file_obj:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file_obj)
+
+
+_MIB: Final = 1 << 20
+
+# The active recorders, a list is used to avoid global statements:
+_RECORDERS: Final[list[_SpanRecorder]] = []
+
+
+@contextmanager
+def _record_spans(recorder: _SpanRecorder | None = None) -> Iterator[_SpanRecorder]:
+    """Record all spans within the context, by default in a new recorder."""
+    if recorder is None:
+        recorder = _SpanRecorder()
+    _RECORDERS.append(recorder)
+    try:
+        yield recorder
+    finally:
+        _RECORDERS.remove(recorder)
+
+
+def _is_recording() -> bool:
+    return bool(_RECORDERS)
+
+
+@contextmanager
+def _span(name: str) -> Iterator[None]:
+    """Time a phase, if spans are being recorded."""
+    if not _RECORDERS:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        span = _Span(name, start, time.perf_counter() - start, threading.get_ident())
+        for recorder in _RECORDERS:
+            recorder.add(span)
+
+
+def _sample_memory(name: str) -> None:
+    """Record the memory use of the process, if spans are being recorded."""
+    if not _RECORDERS:
+        return
+    sample = _MemorySample(name, time.perf_counter(), _get_rss(), _get_peak_rss())
+    for recorder in _RECORDERS:
+        recorder.add_sample(sample)
+
+
+def _get_rss() -> int:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file_obj:  # noqa: PTH123
+            return int(file_obj.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return _get_peak_rss()
+
+
+def _get_peak_rss() -> int:
+    # On Linux the peak resident set size is reported in kilobytes:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _TimedPluginManager(PluginManager):
+    """A plugin manager that times the steps and result handlers of a plan."""
+
+    def get_plugin(self, plugin_type: PluginType, method: str) -> Any:  # noqa: ANN401
+        """Retrieve a plugin, wrapping plan plugins to time their objects."""
+        plugin = super().get_plugin(plugin_type, method)
+        if plugin_type == "plan":
+            return _TimedPlanPlugin(plugin)
+        return plugin
+
+
+class _TimedPlanPlugin(PlanPlugin):
+    def __init__(self, plugin: PlanPlugin) -> None:
+        self._plugin = plugin
+
+    def create(  # type: ignore[override]
+        self, config: PlanStepConfig | ResultHandlerConfig, plan: Plan
+    ) -> PlanStep | ResultHandler:
+        obj = self._plugin.create(config, plan)  # type: ignore[arg-type]
+        _, _, name = config.run.lower().rpartition("/")
+        if isinstance(obj, ResultHandler):
+            return _TimedResultHandler(obj, config, plan, f"handler:{name}")  # type: ignore[arg-type]
+        return _TimedPlanStep(obj, config, plan, f"step:{name}")  # type: ignore[arg-type]
+
+    def is_supported(self, method: str) -> bool:
+        return self._plugin.is_supported(method)
+
+    @property
+    def functions(self) -> dict[str, Any]:
+        return self._plugin.functions
+
+
+class _TimedPlanStep(PlanStep):
+    def __init__(
+        self, step: PlanStep, config: PlanStepConfig, plan: Plan, name: str
+    ) -> None:
+        super().__init__(config, plan)
+        self._step = step
+        self._name = name
+
+    def run(self) -> None:
+        with _span(self._name):
+            self._step.run()
+
+
+class _TimedResultHandler(ResultHandler):
+    def __init__(
+        self,
+        handler: ResultHandler,
+        config: ResultHandlerConfig,
+        plan: Plan,
+        name: str,
+    ) -> None:
+        super().__init__(config, plan)
+        self._handler = handler
+        self._name = name
+
+    def handle_event(self, event: Event) -> Event:
+        with _span(self._name):
+            return self._handler.handle_event(event)
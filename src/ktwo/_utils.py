@@ -2,20 +2,118 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Sequence
+import copy
+import hashlib
+import json
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Final, Sequence, TypeVar
 
+import numpy as np
 from ropt.enums import ResultAxis
+from ropt.results import FunctionResults, GradientResults
 
 if TYPE_CHECKING:
     from everest.config import EverestConfig
+    from ropt.config.enopt import EnOptConfig
+    from ropt.results import Results
+
+_T = TypeVar("_T")
+
+_CONFIG_CACHE_SIZE: Final = 32
+
+
+class _ConfigCache:
+    """A least-recently-used cache of validated and converted configurations.
+
+    Entries are keyed by a hash of the canonical JSON representation of the
+    configuration dict, so that equal dicts share the same entry, even if they
+    are different objects. Configurations containing values that cannot be
+    represented exactly in JSON, other than numpy values, are not cached.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+
+    def get_everest_config(self, config: dict[str, Any]) -> EverestConfig:
+        entry = self._get_entry(config)
+        if "everest" not in entry:
+            from everest.config import EverestConfig  # noqa: PLC0415
+
+            entry["everest"] = EverestConfig.model_validate(config)
+        everest_config: EverestConfig = entry["everest"]
+        return everest_config
+
+    def get_enopt_config(self, config: dict[str, Any]) -> EnOptConfig:
+        entry = self._get_entry(config)
+        if "enopt" not in entry:
+            from everest.optimizer.everest2ropt import everest2ropt  # noqa: PLC0415
+
+            entry["enopt"] = everest2ropt(self.get_everest_config(config))
+        enopt_config: EnOptConfig = entry["enopt"]
+        return enopt_config
+
+    def _get_entry(self, config: dict[str, Any]) -> dict[str, Any]:
+        try:
+            key = hashlib.sha256(
+                json.dumps(
+                    config, sort_keys=True, separators=(",", ":"), default=_to_json
+                ).encode()
+            ).hexdigest()
+        except TypeError:
+            # The configuration cannot be represented exactly, do not cache it:
+            return {}
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = {}
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+
+def _to_json(value: object) -> Any:  # noqa: ANN401
+    # Convert numpy values exactly, their string representation may be rounded:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    msg = f"Object of type {type(value).__name__} is not JSON serializable"
+    raise TypeError(msg)
+
+
+_CONFIG_CACHE: Final = _ConfigCache(_CONFIG_CACHE_SIZE)
+
+
+def _get_everest_config(config: dict[str, Any]) -> EverestConfig:
+    return _CONFIG_CACHE.get_everest_config(config)
+
+
+def _get_enopt_config(config: dict[str, Any]) -> EnOptConfig:
+    return _CONFIG_CACHE.get_enopt_config(config)
+
+
+_NAMES_CACHE: Final[dict[int, dict[str, Sequence[str] | None]]] = {}
 
 
 def _get_names(
     everest_config: EverestConfig | None,
 ) -> dict[str, Sequence[str] | None] | None:
+    # Configuration objects are not modified after validation, hence the names
+    # are cached by the identity of the object, until it is garbage collected:
     if everest_config is None:
         return None
+    key = id(everest_config)
+    names = _NAMES_CACHE.get(key)
+    if names is None:
+        names = _NAMES_CACHE[key] = _build_names(everest_config)
+        weakref.finalize(everest_config, _NAMES_CACHE.pop, key, None)
+    return names
 
+
+def _build_names(everest_config: EverestConfig) -> dict[str, Sequence[str] | None]:
     def _join(controls: tuple[str, str, int | tuple[str, str]]) -> str:
         if len(controls) == 3:  # noqa: PLR2004
             return f"{controls[0]}_{controls[1]}-{controls[2]}"
@@ -25,12 +123,57 @@ def _get_names(
         ResultAxis.VARIABLE: tuple(
             _join(control) for control in everest_config.control_name_tuples
         ),
-        ResultAxis.OBJECTIVE: everest_config.objective_names,
-        ResultAxis.NONLINEAR_CONSTRAINT: everest_config.constraint_names,
-        ResultAxis.REALIZATION: everest_config.model.realizations,
+        ResultAxis.OBJECTIVE: tuple(everest_config.objective_names),
+        ResultAxis.NONLINEAR_CONSTRAINT: tuple(everest_config.constraint_names),
+        ResultAxis.REALIZATION: tuple(everest_config.model.realizations),
     }
 
 
+def _maximize(results: Results) -> Results:
+    """Convert results to maximization results.
+
+    Like `ropt.results.convert_to_maximize`, but only the objective arrays are
+    copied, all other fields are shared with the original results.
+    """
+    results = copy.copy(results)
+    if isinstance(results, FunctionResults):
+        results.evaluations = _negate(
+            results.evaluations, "objectives", "scaled_objectives"
+        )
+        if results.functions is not None:
+            results.functions = _negate(
+                results.functions,
+                "weighted_objective",
+                "objectives",
+                "scaled_objectives",
+            )
+    elif isinstance(results, GradientResults):
+        results.evaluations = _negate(
+            results.evaluations, "perturbed_objectives", "scaled_perturbed_objectives"
+        )
+        if results.gradients is not None:
+            results.gradients = _negate(
+                results.gradients,
+                "weighted_objective",
+                "objectives",
+                "scaled_objectives",
+            )
+    return results
+
+
+def _negate(field: _T, *names: str) -> _T:
+    # Shallow copies do not call __post_init__, which would copy all arrays:
+    field = copy.copy(field)
+    for name in names:
+        value = getattr(field, name)
+        if value is not None:
+            value = np.negative(value)
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+            setattr(field, name, value)
+    return field
+
+
 # ruff: noqa: ERA001,TD002,TD003,FIX002
 
 # TODO: Change to this when formatted_control_names is available:
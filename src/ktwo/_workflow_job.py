@@ -3,20 +3,21 @@
 from __future__ import annotations
 
 import shlex
+import time
 from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Any, List
 
-from ert import WorkflowRunner
-from ert.config import ErtConfig
-from everest.simulator.everest_to_ert import _everest_to_ert_config_dict
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PositiveInt, model_validator
 from ropt.plugins.plan.base import PlanStep
 
+from ._timing import _span
+
 if TYPE_CHECKING:
+    from ert.config import ErtConfig, Workflow, WorkflowJob
     from ert.storage import Storage
-    from everest.config import EverestConfig
     from ropt.config.plan import PlanStepConfig
     from ropt.plan import Plan
 
@@ -27,11 +28,21 @@ class K2WorkflowJobStep(PlanStep):
     class K2WorkflowJobStepWith(BaseModel):
         """Parameters used by the workflow job step.
 
+        If `parallel` is set, the jobs are run concurrently, hence they should
+        not depend on each other. If `timings_var` is set, a list with the
+        command and the run time of each job is stored in that plan variable.
+
         Attributes:
-            jobs: The jobs to run.
+            jobs:        The jobs to run.
+            parallel:    Run the jobs concurrently.
+            max_workers: Maximum number of jobs to run concurrently.
+            timings_var: Name of the variable to store the job timings.
         """
 
         jobs: List[str]
+        parallel: bool = False
+        max_workers: PositiveInt | None = None
+        timings_var: str | None = None
 
         model_config = ConfigDict(
             extra="forbid",
@@ -40,55 +51,82 @@ class K2WorkflowJobStep(PlanStep):
             frozen=True,
         )
 
+        @model_validator(mode="before")
+        @classmethod
+        def _jobs_shorthand(cls, value: Any) -> Any:  # noqa: ANN401
+            if isinstance(value, str):
+                return {"jobs": [value.strip()]}
+            if isinstance(value, Sequence):
+                return {"jobs": value}
+            return value
+
     def __init__(
         self,
         config: PlanStepConfig,
         plan: Plan,
-        everest_config: EverestConfig,
+        ert_config: ErtConfig,
         storage: Storage,
     ) -> None:
         """Initialize a workflow job step.
 
         Args:
-            config: The configuration of the step.
-            plan:   The plan that runs this step.
+            config:     The configuration of the step.
+            plan:       The plan that runs this step.
+            ert_config: The ERT configuration that provides the workflow jobs.
+            storage:    The ERT storage.
         """
         super().__init__(config, plan)
-        with_ = config.with_
-        if isinstance(with_, str):
-            with_ = {"jobs": [with_.strip()]}
-        elif isinstance(with_, Sequence):
-            with_ = {"jobs": with_}
-        self._jobs = self.K2WorkflowJobStepWith.model_validate(with_).jobs
-        self._everest_config = everest_config
+        self._with = self.K2WorkflowJobStepWith.model_validate(config.with_)
+        self._ert_config = ert_config
         self._storage = storage
 
     def run(self) -> None:
         """Run the workflow job step."""
+        from ert.config import Workflow  # noqa: PLC0415
+
+        commands = [
+            shlex.join([str(self.plan.eval(item)) for item in shlex.split(job)])
+            for job in self._with.jobs
+        ]
         with NamedTemporaryFile(
             "w", encoding="utf-8", suffix=".workflow", delete=False
         ) as fp:
             file_name = Path(fp.name)
-            workflow_name = file_name.stem
-            for job in self._jobs:
-                fp.write(
-                    shlex.join([str(self.plan.eval(item)) for item in shlex.split(job)])
-                    + "\n"
-                )
-
-        ert_dict = _everest_to_ert_config_dict(self._everest_config)
+            fp.writelines(f"{command}\n" for command in commands)
         try:
-            ert_dict["LOAD_WORKFLOW"] = [
-                *ert_dict.get("LOAD_WORKFLOW", []),
-                (file_name, workflow_name),
-            ]
-            ert_config = ErtConfig.with_plugins().from_dict(config_dict=ert_dict)
-            runner = WorkflowRunner(
-                ert_config.workflows[workflow_name], self._storage, None, ert_config
+            workflow = Workflow.from_file(
+                str(file_name),
+                self._ert_config.substitutions,
+                self._ert_config.workflow_jobs,
             )
-            runner.run_blocking()
-            if not all(v["completed"] for v in runner.workflowReport().values()):
-                msg = "workflow job failed"
-                raise RuntimeError(msg)
         finally:
             file_name.unlink(missing_ok=True)
+
+        # Each job is run as a separate workflow, to time it:
+        workflows = [Workflow(workflow.src_file, [item]) for item in workflow]
+        if self._with.parallel:
+            with ThreadPoolExecutor(max_workers=self._with.max_workers) as executor:
+                results = list(executor.map(self._run_workflow, workflows))
+        else:
+            results = [self._run_workflow(item) for item in workflows]
+
+        if self._with.timings_var is not None:
+            self.plan[self._with.timings_var] = [
+                {"job": command, "duration": duration}
+                for command, (duration, _) in zip(commands, results, strict=True)
+            ]
+        if not all(completed for _, completed in results):
+            msg = "workflow job failed"
+            raise RuntimeError(msg)
+
+    def _run_workflow(self, workflow: Workflow) -> tuple[float, bool]:
+        from ert import WorkflowRunner  # noqa: PLC0415
+
+        job: WorkflowJob = workflow[0][0]
+        runner = WorkflowRunner(workflow, self._storage, None, self._ert_config)
+        start = time.perf_counter()
+        with _span(f"workflow_job:{job.name}"):
+            runner.run_blocking()
+        return time.perf_counter() - start, all(
+            item["completed"] for item in runner.workflowReport().values()
+        )
@@ -0,0 +1,216 @@
+"""The k2 benchmark script."""
+
+from __future__ import annotations
+
+import json
+import platform
+import shutil
+import tempfile
+import time
+from contextlib import chdir
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import click
+import numpy as np
+import polars as pl
+from ert.config import GenDataConfig
+from ert.storage import open_storage
+from everest.config import EverestConfig
+
+from ._responses import _load_results
+from ._timing import _record_spans
+from .main import _run
+from .version import __version__
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from ert.storage import Ensemble
+    from numpy.typing import NDArray
+
+
+@click.command()
+@click.argument("config_file", type=click.Path(exists=True, dir_okay=False))
+@click.argument("plan_files", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False),
+    default="k2-bench.json",
+    show_default=True,
+    help="JSON file to write the timings to.",
+)
+@click.option(
+    "--repeat", "-n", type=click.IntRange(min=1), default=1, help="Runs per plan."
+)
+@click.option("--keep", is_flag=True, help="Keep the output of the runs.")
+def main(
+    config_file: str,
+    plan_files: tuple[str, ...],
+    output: str,
+    repeat: int,
+    *,
+    keep: bool,
+) -> None:
+    """Benchmark the overhead of k2.
+
+    Runs each plan with the given Everest configuration file, and records the
+    time spent in each phase of the runs. To use a fresh output directory for
+    each run, the directory containing the configuration file is copied to a
+    temporary location, where the run is executed.
+    """
+    runs = []
+    for plan_file in plan_files:
+        for iteration in range(repeat):
+            result = _bench(Path(config_file), Path(plan_file), keep=keep)
+            result["iteration"] = iteration
+            runs.append(result)
+            print(f"{plan_file} [{iteration}]: {result['wall']:.2f}s")
+    report = {
+        "ktwo": __version__,
+        "python": platform.python_version(),
+        "config": str(Path(config_file).resolve()),
+        "runs": runs,
+    }
+    with Path(output).open("w", encoding="utf-8") as file_obj:
+        json.dump(report, file_obj, indent=2)
+
+
+def _bench(config_file: Path, plan_file: Path, *, keep: bool) -> dict[str, Any]:
+    # Copy the configuration directory, except any existing output:
+    output_dir = Path(EverestConfig.load_file(str(config_file)).output_dir).resolve()
+    run_dir = Path(tempfile.mkdtemp(prefix="k2-bench-"))
+    shutil.copytree(
+        config_file.parent,
+        run_dir,
+        ignore=lambda path, names: [
+            name for name in names if Path(path, name).resolve() == output_dir
+        ],
+        dirs_exist_ok=True,
+    )
+    try:
+        with chdir(run_dir), _record_spans() as recorder:
+            start = time.perf_counter()
+            _run(run_dir / config_file.name, plan_file.resolve(), restart=False)
+            wall = time.perf_counter() - start
+    finally:
+        if keep:
+            print(f"Output of {plan_file} stored in {run_dir}")
+        else:
+            shutil.rmtree(run_dir, ignore_errors=True)
+    return {
+        "plan": str(plan_file.resolve()),
+        "wall": wall,
+        "phases": recorder.summary(),
+        "memory": recorder.memory(),
+    }
+
+
+@click.command()
+@click.option(
+    "--sizes",
+    "-s",
+    default="10,100,1000,10000",
+    show_default=True,
+    help="Comma-separated ensemble sizes.",
+)
+@click.option(
+    "--responses",
+    "-r",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Number of responses per simulation.",
+)
+@click.option(
+    "--max-baseline",
+    type=click.IntRange(min=0),
+    default=1000,
+    show_default=True,
+    help="Largest ensemble to time the per-simulation loading for.",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False),
+    default="k2-bench-gather.json",
+    show_default=True,
+    help="JSON file to write the timings to.",
+)
+def gather_main(sizes: str, responses: int, max_baseline: int, output: str) -> None:
+    """Benchmark the gathering of simulation results.
+
+    Creates ensembles of the given sizes in a temporary ERT storage, and times
+    loading their results in bulk, as k2 does, and per simulation, as ERT does.
+    """
+    names = [f"response_{idx}" for idx in range(responses)]
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="k2-bench-") as path:
+        storage = open_storage(path, mode="w")
+        experiment = storage.create_experiment(
+            responses=[GenDataConfig(keys=names)], name="bench"
+        )
+        for size in (int(item) for item in sizes.split(",")):
+            ensemble = storage.create_ensemble(
+                experiment, ensemble_size=size, name=f"ensemble_{size}"
+            )
+            for sim_id in range(size):
+                ensemble.save_response(
+                    "gen_data",
+                    pl.DataFrame(
+                        {
+                            "response_key": names,
+                            "report_step": pl.Series([0] * responses, dtype=pl.UInt16),
+                            "index": pl.Series([0] * responses, dtype=pl.UInt16),
+                            "values": pl.Series(
+                                np.arange(responses) + sim_id, dtype=pl.Float32
+                            ),
+                        }
+                    ),
+                    sim_id,
+                )
+            successful = [True] * size
+            start = time.perf_counter()
+            bulk = _load_results(ensemble, names, {}, successful).values
+            result: dict[str, Any] = {
+                "size": size,
+                "bulk": time.perf_counter() - start,
+            }
+            if size <= max_baseline:
+                start = time.perf_counter()
+                baseline = _load_results_per_simulation(ensemble, names, successful)
+                result["per_simulation"] = time.perf_counter() - start
+                assert np.array_equal(bulk, baseline)
+            runs.append(result)
+            print(
+                ", ".join(
+                    f"{key}: {value:.3f}s" if isinstance(value, float) else str(value)
+                    for key, value in result.items()
+                )
+            )
+    report = {
+        "ktwo": __version__,
+        "python": platform.python_version(),
+        "responses": responses,
+        "runs": runs,
+    }
+    with Path(output).open("w", encoding="utf-8") as file_obj:
+        json.dump(report, file_obj, indent=2)
+
+
+def _load_results_per_simulation(
+    ensemble: Ensemble, names: Sequence[str], successful: Sequence[bool]
+) -> NDArray[np.float64]:
+    # Load the results as EverestRunModel._gather_simulation_results does:
+    values = np.full((len(successful), len(names)), np.nan, dtype=np.float64)
+    for sim_id, success in enumerate(successful):
+        if success:
+            for idx, name in enumerate(names):
+                data = ensemble.load_responses(name, (sim_id,))
+                values[sim_id, idx] = data["values"].to_numpy()[0]
+    return values
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,19 @@
 from __future__ import annotations
 
 import warnings
+from contextlib import ExitStack
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable
 
 import click
-from everest.config_file_loader import yaml_file_to_substituted_config_dict
-from pydantic import BaseModel, ConfigDict
-from ropt.config.plan import PlanConfig
-from ropt.results import FunctionResults, convert_to_maximize
+from pydantic import BaseModel, ConfigDict, ValidationError
 from ruamel import yaml
 
-from ._run_model import K2RunModel
+from ._cache import K2CacheConfig  # noqa: TC001
+from ._evaluator import _load_evaluator
+from ._inputs import K2InputsConfig  # noqa: TC001
+from ._metrics import K2MetricsConfig  # noqa: TC001
+from ._timing import _record_spans
 
 if TYPE_CHECKING:
     from ropt.plan import Event
@@ -25,11 +27,20 @@ class K2Config(BaseModel):
     """Configuration used by the K2 program.
 
     Attributes:
-        plan:    The plan to execute.
-        plugins: Paths to plugins to load.
+        plan:      The plan to execute.
+        plugins:   Paths to plugins to load.
+        cache:     Optional configuration of a persistent evaluation cache.
+        evaluator: Optional Python function (`module:function` or
+                   `file.py:function`), used instead of the forward model.
+        inputs:    Optional configuration of the installation of input data.
+        metrics:   Optional configuration of the export of live metrics.
     """
 
     plan: dict[str, Any]
+    cache: K2CacheConfig | None = None
+    evaluator: str | None = None
+    inputs: K2InputsConfig | None = None
+    metrics: K2MetricsConfig | None = None
 
     model_config = ConfigDict(
         extra="ignore",
@@ -44,25 +55,136 @@ class K2Config(BaseModel):
 @click.argument("plan_file", type=click.Path(exists=True))
 @click.option("--verbose", "-v", is_flag=True, help="Print optimization results.")
 @click.option("--restart", "-r", is_flag=True, help="Allow restart.")
-def main(config_file: str, plan_file: str, *, verbose: bool, restart: bool) -> None:
+@click.option(
+    "--trace",
+    type=click.Path(dir_okay=False),
+    help="Write timing spans to a Chrome trace (Perfetto) JSON file.",
+)
+@click.option(
+    "--check", is_flag=True, help="Validate the configuration and plan, then exit."
+)
+def main(  # noqa: PLR0913
+    config_file: str,
+    plan_file: str,
+    *,
+    verbose: bool,
+    restart: bool,
+    trace: str | None,
+    check: bool,
+) -> None:
     """Run k2.
 
     K2 requires an Everest configuration file and a K2 config file.
     """
-    everest_dict = yaml_file_to_substituted_config_dict(config_file)
-    k2_dict = yaml.YAML(typ="safe", pure=True).load(Path(plan_file))
-    K2RunModel(everest_dict, restart=restart).run_plan(
-        PlanConfig.model_validate(K2Config.model_validate(k2_dict).plan),
-        report=_report if verbose else None,
+    if check:
+        _check(Path(config_file), Path(plan_file))
+        return
+    with ExitStack() as stack:
+        if trace is not None:
+            recorder = stack.enter_context(_record_spans())
+            stack.callback(recorder.write_trace, Path(trace))
+        _run(
+            Path(config_file),
+            Path(plan_file),
+            restart=restart,
+            report=_report if verbose else None,
+        )
+
+
+def _run(
+    config_file: Path,
+    plan_file: Path,
+    *,
+    restart: bool,
+    report: Callable[[Event], None] | None = None,
+) -> None:
+    from ropt.config.plan import PlanConfig  # noqa: PLC0415
+
+    from ._check import _check_plan  # noqa: PLC0415
+
+    k2_dict = yaml.YAML(typ="safe", pure=True).load(plan_file)
+    k2_config = K2Config.model_validate(k2_dict)
+    plan_config = PlanConfig.model_validate(k2_config.plan)
+
+    # Check the plan before the slow setup of the run model:
+    _check_plan(plan_config, {"config_path": str(config_file.parent.resolve())})
+    evaluator = (
+        None
+        if k2_config.evaluator is None
+        else _load_evaluator(k2_config.evaluator, plan_file.parent)
     )
 
+    from everest.config_file_loader import (  # noqa: PLC0415
+        yaml_file_to_substituted_config_dict,
+    )
+
+    from ._run_model import K2RunModel  # noqa: PLC0415
+
+    everest_dict = yaml_file_to_substituted_config_dict(str(config_file))
+    K2RunModel(
+        everest_dict,
+        restart=restart,
+        cache=k2_config.cache,
+        evaluator=evaluator,
+        inputs=k2_config.inputs,
+        metrics=k2_config.metrics,
+    ).run_plan(plan_config, report=report)
+
+
+def _check(config_file: Path, plan_file: Path) -> None:
+    # The plan is checked first, since it does not require the slow import of
+    # the Everest and ERT modules:
+    from ropt.config.plan import PlanConfig  # noqa: PLC0415
+    from ropt.exceptions import ConfigError  # noqa: PLC0415
+
+    from ._check import _check_plan  # noqa: PLC0415
+
+    try:
+        k2_dict = yaml.YAML(typ="safe", pure=True).load(plan_file)
+        k2_config = K2Config.model_validate(k2_dict)
+        _check_plan(
+            PlanConfig.model_validate(k2_config.plan),
+            {"config_path": str(config_file.parent.resolve())},
+        )
+        if k2_config.evaluator is not None:
+            _load_evaluator(k2_config.evaluator, plan_file.parent)
+    except (
+        ValidationError,
+        ConfigError,
+        yaml.YAMLError,
+        ImportError,
+        ValueError,
+        TypeError,
+        AttributeError,
+    ) as exc:
+        msg = f"Invalid plan file {plan_file}:\n{exc}"
+        raise click.ClickException(msg) from exc
+
+    from everest.config import EverestConfig  # noqa: PLC0415
+    from everest.config_file_loader import (  # noqa: PLC0415
+        yaml_file_to_substituted_config_dict,
+    )
+
+    try:
+        EverestConfig.model_validate(
+            yaml_file_to_substituted_config_dict(str(config_file))
+        )
+    except (ValidationError, yaml.YAMLError, ValueError) as exc:
+        msg = f"Invalid configuration file {config_file}:\n{exc}"
+        raise click.ClickException(msg) from exc
+
+    click.echo(f"{config_file} and {plan_file} are valid.")
+
 
 def _report(event: Event) -> None:
     """Report results of an evaluation."""
+    from ropt.results import FunctionResults  # noqa: PLC0415
+
+    from ._utils import _maximize  # noqa: PLC0415
+
     for item in event.data["results"]:
         if isinstance(item, FunctionResults) and item.functions is not None:
-            maximization_result = convert_to_maximize(item)
-            assert maximization_result is not None
+            maximization_result = _maximize(item)
             assert isinstance(maximization_result, FunctionResults)
             print(f"  variables: {maximization_result.evaluations.variables}")
             assert maximization_result.functions is not None
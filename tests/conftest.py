@@ -0,0 +1,11 @@
+from pathlib import Path
+
+import pytest
+from everest.config import EverestConfig
+
+_EXAMPLES = Path(__file__).parent.parent / "examples"
+
+
+@pytest.fixture(name="everest_config")
+def everest_config_fixture() -> EverestConfig:
+    return EverestConfig.load_file(_EXAMPLES / "rosenbrock" / "config_rosenbrock.yml")
@@ -0,0 +1,42 @@
+import time
+from pathlib import Path
+
+import numpy as np
+from everest.config import EverestConfig
+
+from ktwo._cache import K2CacheConfig, _EvaluationCache
+
+
+def _make_cache(
+    everest_config: EverestConfig, tmp_path: Path, **kwargs: float
+) -> _EvaluationCache:
+    config = K2CacheConfig(path=str(tmp_path / "cache.sqlite"), shared=True, **kwargs)
+    return _EvaluationCache(config, everest_config)
+
+
+def test_cache_claim_stored(everest_config: EverestConfig, tmp_path: Path) -> None:
+    cache = _make_cache(everest_config, tmp_path)
+    controls = np.array([1.0, 2.0])
+    cache.add(0, controls, np.array([3.0]), None)
+    assert not cache.claim([(0, controls)])
+    assert cache.claim([(1, controls)])
+    cache.close()
+
+
+def test_cache_claim_expired(everest_config: EverestConfig, tmp_path: Path) -> None:
+    cache = _make_cache(everest_config, tmp_path, max_age=0.1)
+    controls = np.array([1.0, 2.0])
+    cache.add(0, controls, np.array([3.0]), None)
+    assert cache.get(0, controls) is not None
+    time.sleep(0.2)
+    assert cache.get(0, controls) is None
+    assert cache.claim([(0, controls)])
+    cache.close()
+
+
+def test_cache_key_large_values(everest_config: EverestConfig, tmp_path: Path) -> None:
+    cache = _make_cache(everest_config, tmp_path)
+    cache.add(0, np.array([2e12]), np.array([1.0]), None)
+    assert cache.get(0, np.array([3e12])) is None
+    assert cache.get(0, np.array([-2e12])) is None
+    cache.close()
@@ -0,0 +1,35 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import ktwo._inputs
+from ktwo._inputs import K2InputsConfig, _InputStore, _install
+
+
+def test_inputs_digest_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    source = tmp_path / "data.txt"
+    source.write_text("data")
+    calls: list[Path] = []
+    digest = ktwo._inputs._digest
+
+    def _counting_digest(path: Path) -> str:
+        calls.append(path)
+        return digest(path)
+
+    monkeypatch.setattr(ktwo._inputs, "_digest", _counting_digest)
+    store = _InputStore(K2InputsConfig(), tmp_path / "store")
+    paths = {store._store(source) for _ in range(5)}
+    assert len(paths) == 1
+    assert len(calls) == 1
+
+
+def test_inputs_default_is_writable(tmp_path: Path) -> None:
+    source = tmp_path / "data.txt"
+    source.write_text("data")
+    store = _InputStore(K2InputsConfig(), tmp_path / "store")
+    target = tmp_path / "runpath" / "data.txt"
+    _install(store._store(source), target, K2InputsConfig().mode)
+    assert os.access(target, os.W_OK)
+    target.write_text("modified")
+    assert source.read_text() == "data"
@@ -0,0 +1,69 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pytest
+from ert.config import GenDataConfig
+from ert.storage import Ensemble, open_storage
+
+from ktwo._responses import _load_results
+
+
+@pytest.fixture
+def ensemble(tmp_path: Path) -> Iterator[Ensemble]:
+    with open_storage(tmp_path / "storage", mode="w") as storage:
+        experiment = storage.create_experiment(
+            responses=[GenDataConfig(keys=["a", "b"])], name="experiment"
+        )
+        ensemble = experiment.create_ensemble(ensemble_size=3, name="ensemble")
+        for sim_id in range(3):
+            ensemble.save_response(
+                "gen_data",
+                pl.DataFrame(
+                    {
+                        "response_key": ["a", "b"],
+                        "report_step": pl.Series([0, 0], dtype=pl.UInt16),
+                        "index": pl.Series([0, 0], dtype=pl.UInt16),
+                        "values": pl.Series([sim_id, 10 * sim_id], dtype=pl.Float32),
+                    }
+                ),
+                sim_id,
+            )
+        yield ensemble
+
+
+_EXPECTED = np.array([[0.0, 0.0], [np.nan, np.nan], [20.0, 2.0]])
+
+
+def test_load_results_scan(ensemble: Ensemble, monkeypatch: pytest.MonkeyPatch) -> None:
+    def _load_responses(key: str, realizations: tuple[int, ...]) -> pl.DataFrame:  # noqa: ARG001
+        raise AssertionError
+
+    monkeypatch.setattr(ensemble, "load_responses", _load_responses)
+    results = _load_results(ensemble, ["b", "a"], {"c": "a"}, [True, False, True])
+    assert np.array_equal(results.values, _EXPECTED, equal_nan=True)
+    assert np.array_equal(results.get(["c"]), _EXPECTED[:, [1]], equal_nan=True)
+    assert results.failed == 1
+
+
+@pytest.mark.parametrize("layout", ["no_method", "other_dir"])
+def test_load_results_fallback(
+    ensemble: Ensemble, monkeypatch: pytest.MonkeyPatch, tmp_path: Path, layout: str
+) -> None:
+    frames = {key: ensemble.load_responses(key, (0, 2)) for key in ("a", "b")}
+    calls: list[str] = []
+
+    def _load_responses(key: str, realizations: tuple[int, ...]) -> pl.DataFrame:
+        assert realizations == (0, 2)
+        calls.append(key)
+        return frames[key]
+
+    monkeypatch.setattr(ensemble, "load_responses", _load_responses)
+    if layout == "no_method":
+        monkeypatch.delattr(ensemble, "_realization_dir")
+    else:
+        monkeypatch.setattr(ensemble, "_realization_dir", lambda _: tmp_path / "other")
+    results = _load_results(ensemble, ["b", "a"], {}, [True, False, True])
+    assert np.array_equal(results.values, _EXPECTED, equal_nan=True)
+    assert sorted(calls) == ["a", "b"]
@@ -0,0 +1,52 @@
+import json
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from ktwo._storage import _StorageIndex
+
+
+def _read_records(path: Path) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in path.read_text().splitlines() if line]
+
+
+def test_storage_index_truncated_record(tmp_path: Path) -> None:
+    path = tmp_path / "index.jsonl"
+    first_id = uuid.uuid4()
+    path.write_text(
+        json.dumps({"experiment": "first", "id": str(first_id)}) + '\n{"experim'
+    )
+    index = _StorageIndex(SimpleNamespace(), path)  # type: ignore[arg-type]
+    assert index._experiments == {"first": first_id}
+    experiments = [
+        SimpleNamespace(name=f"exp{idx}", id=uuid.uuid4()) for idx in range(3)
+    ]
+    for experiment in experiments:
+        index.add_experiment(experiment)  # type: ignore[arg-type]
+    index.close()
+    lines = path.read_text().splitlines()
+    assert lines[1] == '{"experim'
+    records = [json.loads(line) for line in lines[2:]]
+    assert records == [
+        {"experiment": item.name, "id": str(item.id)} for item in experiments
+    ]
+    index = _StorageIndex(SimpleNamespace(), path)  # type: ignore[arg-type]
+    assert index._experiments == {
+        "first": first_id,
+        **{item.name: item.id for item in experiments},
+    }
+
+
+def test_storage_index_complete_records(tmp_path: Path) -> None:
+    path = tmp_path / "index.jsonl"
+    index = _StorageIndex(SimpleNamespace(), path)  # type: ignore[arg-type]
+    experiment = SimpleNamespace(name="first", id=uuid.uuid4())
+    index.add_experiment(experiment)  # type: ignore[arg-type]
+    index.close()
+    index = _StorageIndex(SimpleNamespace(), path)  # type: ignore[arg-type]
+    experiment = SimpleNamespace(name="second", id=uuid.uuid4())
+    index.add_experiment(experiment)  # type: ignore[arg-type]
+    index.close()
+    assert [item["experiment"] for item in _read_records(path)] == ["first", "second"]
+    assert len(path.read_text().splitlines()) == 2
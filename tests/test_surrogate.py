@@ -0,0 +1,32 @@
+import numpy as np
+
+from ktwo._surrogate import _Surrogate
+
+
+def test_surrogate_disabled() -> None:
+    surrogate = _Surrogate()
+    assert not surrogate.enabled
+    controls = np.zeros((2, 3))
+    assert surrogate.screen([0, 0], controls, [0, 1], [0, 1], None) == {}
+
+
+def test_surrogate_history_is_bounded() -> None:
+    surrogate = _Surrogate(max_uncertainty=0.1, max_samples=5)
+    for batch in range(4):
+        controls = np.arange(6.0 * batch, 6.0 * batch + 6.0).reshape(3, 2)
+        surrogate.add([0, 0, 1], controls, controls[:, :1] ** 2)
+    inputs, outputs = surrogate._history[0].get()
+    assert inputs.shape == (5, 2)
+    # The oldest results of realization 0 have been replaced:
+    assert np.array_equal(np.sort(inputs[:, 0]), [8.0, 12.0, 14.0, 18.0, 20.0])
+    assert np.array_equal(outputs[:, 0], inputs[:, 0] ** 2)
+    inputs, _ = surrogate._history[1].get()
+    assert inputs.shape == (4, 2)
+
+
+def test_surrogate_history_large_batch() -> None:
+    surrogate = _Surrogate(max_uncertainty=0.1, max_samples=3)
+    controls = np.arange(10.0).reshape(5, 2)
+    surrogate.add([0] * 5, controls, controls[:, :1])
+    inputs, _ = surrogate._history[0].get()
+    assert np.array_equal(np.sort(inputs[:, 0]), [4.0, 6.0, 8.0])
@@ -0,0 +1,30 @@
+import numpy as np
+
+from ktwo._utils import _ConfigCache
+
+
+def test_config_cache_equal_configs() -> None:
+    cache = _ConfigCache(4)
+    entry = cache._get_entry({"a": np.array([1.0, 2.0]), "b": np.float64(0.5)})
+    assert cache._get_entry({"a": np.array([1.0, 2.0]), "b": 0.5}) is entry
+
+
+def test_config_cache_numpy_precision() -> None:
+    cache = _ConfigCache(4)
+    entry = cache._get_entry({"a": np.array([1.000000001])})
+    assert cache._get_entry({"a": np.array([1.000000002])}) is not entry
+
+
+def test_config_cache_large_arrays() -> None:
+    cache = _ConfigCache(4)
+    values = np.zeros(2000)
+    entry = cache._get_entry({"a": values})
+    values[1000] = 1.0
+    assert cache._get_entry({"a": values}) is not entry
+
+
+def test_config_cache_non_json_values() -> None:
+    cache = _ConfigCache(4)
+    value = object()
+    entry = cache._get_entry({"a": value})
+    assert cache._get_entry({"a": value}) is not entry